@@ -0,0 +1,70 @@
+# Per-frame cost of the rainbow colour conversion: the old float
+# hsv_to_rgb() building tuples for np[i] = ..., against hsv.hsv_into()
+# writing integers straight into the pixel buffer.
+#   mpremote connect $PORT run bench/hsv_bench.py
+import gc
+import time
+from hsv import hsv_into
+
+PIXELS = 16
+FRAMES = 200
+ORDER = (1, 0, 2, 3)  # NeoPixel GRB
+
+
+def hsv_to_rgb(h, s, v):
+    # the float version the effects used before
+    h = h % 360
+    c = v * s
+    x = c * (1 - abs((h / 60) % 2 - 1))
+    m = v - c
+    if h < 60:
+        r, g, b = c, x, 0
+    elif h < 120:
+        r, g, b = x, c, 0
+    elif h < 180:
+        r, g, b = 0, c, x
+    elif h < 240:
+        r, g, b = 0, x, c
+    elif h < 300:
+        r, g, b = x, 0, c
+    else:
+        r, g, b = c, 0, x
+    return (int((r + m) * 255), int((g + m) * 255), int((b + m) * 255))
+
+
+def set_pixel(buf, i, rgb):
+    # what NeoPixel.__setitem__ does
+    o = i * 3
+    for b in range(3):
+        buf[o + ORDER[b]] = rgb[b]
+
+
+def frame_float(buf, pos):
+    for i in range(PIXELS):
+        set_pixel(buf, i, hsv_to_rgb((i * 360 // PIXELS + pos) % 360, 1.0, 0.1))
+
+
+def frame_int(buf, pos):
+    for i in range(PIXELS):
+        hsv_into(buf, i * 3, (i * 360 // PIXELS + pos) % 360, 255, 25, ORDER)
+
+
+def run(name, frame):
+    buf = bytearray(PIXELS * 3)
+    gc.collect()
+    free = gc.mem_free()
+    t0 = time.ticks_us()
+    for pos in range(FRAMES):
+        frame(buf, pos)
+    dt = time.ticks_diff(time.ticks_us(), t0)
+    print("{:6s} {:6d} us/frame  {:6d} bytes allocated/frame".format(
+        name, dt // FRAMES, (free - gc.mem_free()) // FRAMES))
+
+
+gc.disable()  # count allocations instead of collecting them
+run("float", frame_float)
+gc.enable()
+gc.collect()
+gc.disable()
+run("int", frame_int)
+gc.enable()
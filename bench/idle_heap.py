@@ -0,0 +1,36 @@
+# Idle heap and import time of the app, lazy screen modules vs. everything
+# resident (as before the screens were split out of bsides25.py).
+#
+# Run on the badge with the app copied to its filesystem:
+#   mpremote connect $PORT run bench/idle_heap.py
+import gc
+import time
+
+SCREEN_MODULES = ("text", "sponsors", "lights", "badge", "fetch", "diag", "snake")
+
+
+def heap():
+    gc.collect()
+    return gc.mem_free()
+
+
+free0 = heap()
+t0 = time.ticks_ms()
+import bsides25
+bsides25.init_persistence()
+bsides25.init_fonts()
+t_lazy = time.ticks_diff(time.ticks_ms(), t0)
+free_lazy = heap()
+
+t0 = time.ticks_ms()
+for mod in SCREEN_MODULES:
+    __import__("screens." + mod)
+t_rest = time.ticks_diff(time.ticks_ms(), t0)
+free_eager = heap()
+
+print("lazy  (app at idle):     import+init {:5d} ms  heap used {:6d}".format(
+    t_lazy, free0 - free_lazy))
+print("eager (all screens):     import+init {:5d} ms  heap used {:6d}".format(
+    t_lazy + t_rest, free0 - free_eager))
+print("saved by lazy loading:               {:5d} ms             {:6d}".format(
+    t_rest, free_lazy - free_eager))
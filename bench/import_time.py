@@ -0,0 +1,47 @@
+# Import time and heap cost per module, for comparing a source deploy with
+# the precompiled bundle (tools/build_mpy.py). Run once per deploy:
+#   mpremote connect $PORT run bench/import_time.py
+# Modules are imported bottom-up, so each line only counts the module itself.
+import gc
+import os
+import sys
+import time
+
+MODULES = ("ssd1306", "bsides_logo", "bootlog", "splash",
+           "writer.writer", "writer.font6", "writer.font10", "writer.freesans20",
+           "widgets", "events", "scanner", "latency",
+           "effects", "hsv", "palette", "ledout", "pacer", "compositor",
+           "recstore", "kvlog", "sequence", "bsides25",
+           "screens.text", "screens.sponsors", "screens.lights", "screens.badge",
+           "ahttp", "screens.fetch", "screens.diag", "screens.snake")
+
+
+def kind(name):
+    # which file the import system picks up; .py wins when both exist
+    path = name.replace(".", "/")
+    for d in sys.path:
+        for ext in (".py", ".mpy"):
+            try:
+                os.stat((d + "/" if d else "") + path + ext)
+                return ext[1:]
+            except OSError:
+                pass
+    return "?"
+
+
+gc.collect()
+free0 = gc.mem_free()
+total_ms = 0
+print("{:18s} {:>4s} {:>7s} {:>7s}".format("module", "file", "ms", "heap"))
+for name in MODULES:
+    gc.collect()
+    free = gc.mem_free()
+    t0 = time.ticks_us()
+    __import__(name)
+    dt = time.ticks_diff(time.ticks_us(), t0)
+    gc.collect()
+    total_ms += dt / 1000
+    print("{:18s} {:>4s} {:7.1f} {:7d}".format(name, kind(name), dt / 1000, free - gc.mem_free()))
+gc.collect()
+print("{:18s} {:>4s} {:7.1f} {:7d}".format("total", "", total_ms, free0 - gc.mem_free()))
+print("heap free after import: {}".format(gc.mem_free()))
@@ -2,33 +2,37 @@ import sys
 import os
 import ubinascii
 import urandom
-import network
-import socket
-import ssl
 import json
+import struct
 import uasyncio as asyncio
-import time, micropython
-from machine import Pin, I2C
-import ssd1306, neopixel
-import bsides_logo
-
-# Writer
-from writer.writer import Writer
-import writer.freesans20 as freesans20
-import writer.font10 as font10
-import writer.font6 as font6
+import time, micropython, gc
+from machine import Pin
+import neopixel
+import bootlog
+from splash import oled, show_bsides_logo, OLED_WIDTH, OLED_HEIGHT
+from widgets import Label, ListRow, repaint
+from events import EventQueue, EDGE_PRESS, EDGE_RELEASE, EDGE_REPEAT, EDGE_LONG
+from scanner import ButtonScanner
+from latency import LatencyTracer, HOUT
+import effects
+from palette import Palette
+from ledout import LedOutput
+from pacer import FramePacer
+from compositor import Compositor, BLEND_ALPHA
+from recstore import RecordStore
+from kvlog import KVLog
+import sequence
+
+bootlog.mark("import")
 
 # -----------------------
 # Settings
 # -----------------------
-I2C_SCL = 1
-I2C_SDA = 0
-OLED_WIDTH = 128
-OLED_HEIGHT = 64
-
 NEOPIXEL_PIN = 3
 NEOPIXEL_COUNT = 16
-NEOPIXEL_FPS = 50
+NEOPIXEL_FPS = 50       # when the rest of the badge is idle
+NEOPIXEL_FPS_BUSY = 25  # while input is handled and the display flushed
+LED_BUSY_MS = 300       # how long after an input the badge counts as busy
 
 # Buttons
 BTN_NEXT_PIN = 5      # Next / Increase
@@ -39,7 +43,32 @@ DEBOUNCE_MS = 50
 
 # Auto-repeat
 REPEAT_DELAY = 500     # ms before auto-repeat starts
-REPEAT_INTERVAL = 10  # ms between repeats
+REPEAT_INTERVAL = 50   # ms between repeat events
+REPEAT_ACCEL_MS = 100  # step count per repeat event doubles every ACCEL ms held
+REPEAT_MAX_STEP = 64   # upper bound of the step count per repeat event
+LONG_PRESS_MS = 800    # holding BACK this long returns to the menu
+
+# Input scanning: poll all buttons from one task instead of pin IRQs
+INPUT_SCAN = False
+SCAN_MS = 5
+SCAN_DEBOUNCE_MS = 20  # input must be stable this long to count
+
+# Input event queue
+INPUT_QUEUE_SIZE = 32
+INPUT_COALESCE = True  # merge pending repeat events of the same button
+
+# Input latency tracing (IRQ -> pixels on the panel)
+TRACE_LATENCY = False
+LATENCY_TARGET_MS = 50
+TRACE_REPORT_EVERY = 20  # print a report over serial every N traced inputs
+
+# Screen cache
+SCREEN_CACHE_MAX = 8             # screens kept alive at most
+SCREEN_CACHE_MIN_FREE = 16384    # bytes of heap to keep free, else evict LRU
+SCREEN_UNLOAD = True             # drop a screen module once none of its screens is alive
+
+# Parameter persistence: changes are written this long after the last one
+PERSIST_QUIET_MS = 3000
 
 INACTIVITY_TIMEOUT = 5000  # ms
 LOGO_PERIOD = 3000  # ms
@@ -48,13 +77,16 @@ SSID = "bsides-badge"
 PASSWORD = "bsidestallinn"
 URL = "https://badge.bsides.ee"
 URL_QR = "badge.bsides.ee"
+WIFI_IDLE_MS = 60000     # radio goes off this long after the last network use
+WIFI_CONNECT_MS = 10000  # per connection attempt
 
 # -----------------------
 # Globals
 # -----------------------
 button_event = None
-last_button = None
 last_activity = 0
+input_queue = EventQueue(INPUT_QUEUE_SIZE, INPUT_COALESCE)
+tracer = LatencyTracer(LATENCY_TARGET_MS) if TRACE_LATENCY else None
 
 BTN_NEXT = 1
 BTN_PREV = 2
@@ -62,43 +94,88 @@ BTN_SELECT = 3
 BTN_BACK = 4
 
 btn_state = {}       # {btn_id: pressed or not}
-repeat_tasks = {}    # {btn_id: task}
+repeat_tasks = {}    # {btn_id: auto-repeat or long-press task}
+_repeat_start = {}   # {btn_id: ticks_ms when auto-repeat started}
 _last_event_ms = {}  # debounce tracking
 
-i2c_oled = I2C(0, scl=Pin(I2C_SCL), sda=Pin(I2C_SDA))
-oled = ssd1306.SSD1306_I2C(OLED_WIDTH, OLED_HEIGHT, i2c_oled)
-wri6  = Writer(oled, font6, verbose=False)
-wri10 = Writer(oled, font10, verbose=False)
-wri20 = Writer(oled, freesans20, verbose=False)
+# set up by init_fonts() once the splash is showing
+wri6  = None
+wri10 = None
+wri20 = None
 
-username_wri = wri20
+username_wri = None
 username_lines = None
+app_ready = None  # asyncio.Event set when deferred initialisation is done
+
+def init_fonts():
+    global wri6, wri10, wri20, username_wri
+    from writer.writer import Writer
+    import writer.freesans20 as freesans20
+    import writer.font10 as font10
+    import writer.font6 as font6
+    wri6  = Writer(oled, font6, verbose=False)
+    wri10 = Writer(oled, font10, verbose=False)
+    wri20 = Writer(oled, freesans20, verbose=False)
+    username_wri = wri20
 
 # -----------------------
 # Parameters
 # -----------------------
 
 class Parameter:
+    """A setting that reports its changes: subscribers are called with the
+    parameter after each assignment that changes the value, in the task
+    that made it."""
     def __init__(self, name, value, maxval):
         self.name = name
-        self.value = value
+        self._value = value
         self.maxval = maxval
+        self.version = 0  # bumped on every change
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        if value != self._value:
+            self._value = value
+            self.version += 1
+            for callback in self.subscribers:
+                callback(self)
 
 # -----------------------
 # LED effects
 # -----------------------
 
 led_startup    = True
-led_effects    = []
-led_effect     = Parameter("Light_effect", 0, 3)
+sequence.register_dir("sequences")  # streamed animations, listed after the built-in effects
+led_effect     = Parameter("Light_effect", 0, len(effects.registry) - 1)
 led_brightness = Parameter("Brightness", 10, 100)
 led_hue        = Parameter("Hue", 180, 360)
 led_sat        = Parameter("Saturation", 100, 100)
 led_speed      = Parameter("Speed", 30, 100)
 
 # -----------------------
-# JSON parameter storage
+# Settings storage
 # -----------------------
+# The settings (parameters, device ID, name) are one binary record with two
+# alternating slots in SETTINGS_FILE, see lib/recstore.py. They are saved
+# write-behind: a change only bumps params_version and wakes persist_task(),
+# which writes once nothing has changed for PERSIST_QUIET_MS. UI code never
+# touches flash for settings.
+#
+# Everything else the badge keeps (game scores, the WiFi access point) goes in the
+# key-value log `store` (lib/kvlog.py), where a write is a small append. Code
+# on the UI path hands its writes to persist_task() with store_put_later().
 
 params = {
     "Brightness": led_brightness,
@@ -108,42 +185,189 @@ params = {
     "Light_effect" : led_effect
 }
 
-# --- Snake high score param (persistent in params.json) ---
-snake_high_score = Parameter("SnakeHighScore", 0, 9999)
-params["SnakeHighScore"] = snake_high_score
+SETTINGS_FILE = "settings.bin"
+SETTINGS_VERSION = 2
+# one u16 per parameter in SETTINGS_PARAMS order, device ID (6 bytes),
+# name length, name (UTF-8)
+SETTINGS_PARAMS = ("Brightness", "Hue", "Saturation", "Speed", "Light_effect")
+SETTINGS_FORMAT = "<5H6sB64s"
+SETTINGS_FORMAT_V1 = "<6H6sB64s"  # + snake high score, now in the store
+# where the device ID starts in each version; later versions keep it at 10 so
+# older firmware still finds it
+SETTINGS_ID_OFFSET = {1: 12, 2: 10}
+SETTINGS_MAX = 83  # sets the slot size and so the file layout; keep it
+NAME_MAX = 64  # bytes
+
+STORE_FILE = "data.kv"
+SNAKE_TOP_KEY = "snake/top"  # leaderboard: best scores, u16 each, highest first
+
+# files of earlier firmware, taken over into the record on first boot
+LEGACY_PARAMS_FILE = "params.json"
+LEGACY_NAME_FILE = "yourname.txt"
+LEGACY_ID_FILE = "id.txt"
+
+settings_store = RecordStore(SETTINGS_FILE, SETTINGS_MAX)
+store = KVLog(STORE_FILE)
+
+params_version = 0  # sum of changes to any persistent setting
+saved_version = 0   # params_version that is on flash
+settings_readonly = False  # the record is newer or damaged: never overwrite it
+params_dirty = None # Event, set on change; created in main()
+params_changed_ms = 0
+params_saves = 0
+store_pending = {}  # key -> value, written to the store by persist_task()
+
+USERNAME = None
+device_id = None
+
+def params_changed(param=None):
+    global params_version, params_changed_ms
+    params_version += 1
+    params_changed_ms = time.ticks_ms()
+    if params_dirty:
+        params_dirty.set()
+
+for p in params.values():
+    p.subscribe(params_changed)
+
+def set_username(name):
+    """Set the badge owner's name; saved with the other settings."""
+    global USERNAME, username_lines
+    # cut on a character boundary so the UTF-8 fits the record
+    while len(name.encode()) > NAME_MAX:
+        name = name[:-1]
+    name = name or None
+    if name != USERNAME:
+        USERNAME = name
+        username_lines = None
+        params_changed()
+
+def pack_settings():
+    name = (USERNAME or "").encode()
+    fields = [params[p].value for p in SETTINGS_PARAMS]
+    fields += (ubinascii.unhexlify(device_id), len(name), name)
+    return struct.pack(SETTINGS_FORMAT, *fields)
+
+def unpack_settings(version, payload):
+    global USERNAME, device_id
+    # decode everything before applying anything
+    fields = list(struct.unpack(SETTINGS_FORMAT_V1 if version == 1 else SETTINGS_FORMAT, payload))
+    raw_id, name_len, name = fields[-3:]
+    name = name[:name_len].decode() or None
+    if version == 1:
+        migrate_snake_high(fields.pop(len(SETTINGS_PARAMS)))
+        params_changed()  # rewrite as the current version
+    for p, val in zip(SETTINGS_PARAMS, fields):
+        params[p].value = val
+    device_id = ubinascii.hexlify(raw_id).decode().upper()
+    USERNAME = name
+
+def store_put_later(key, value):
+    """Write value under key from persist_task(), off the caller's path."""
+    store_pending[key] = value
+    if params_dirty:
+        params_dirty.set()
+
+def store_get(key, default=None):
+    """Newest value of key, including one not written yet."""
+    value = store_pending.get(key)
+    return store.get(key, default) if value is None else value
+
+def save_settings():
+    # the record store writes the slot not holding the current record, so a
+    # reset while writing leaves the previous settings intact
+    global saved_version, params_saves
+    version = params_version
+    settings_store.save(SETTINGS_VERSION, pack_settings())
+    saved_version = version
+    params_saves += 1
+
+def keep_record(version, payload):
+    # A record this firmware cannot read, e.g. from newer firmware before a
+    # downgrade. Run on defaults without saving over it, but keep the badge
+    # identity.
+    global settings_readonly, device_id
+    settings_readonly = True
+    print("Settings record v{} not readable, not saving settings".format(version))
+    off = SETTINGS_ID_OFFSET.get(version, SETTINGS_ID_OFFSET[SETTINGS_VERSION])
+    if len(payload) >= off + 6:
+        device_id = ubinascii.hexlify(payload[off:off + 6]).decode().upper()
+    else:
+        device_id = load_legacy_device_id() or create_device_id()
+
+def load_settings():
+    """Load the settings record; False if there is none."""
+    global saved_version
+    rec = settings_store.load()
+    if not rec:
+        return False
+    if rec[0] > SETTINGS_VERSION:
+        keep_record(*rec)
+        return True
+    version = params_version
+    try:
+        unpack_settings(*rec)
+    except (ValueError, UnicodeError):
+        keep_record(*rec)
+        return True
+    if rec[0] == SETTINGS_VERSION:
+        saved_version = params_version  # what we just loaded needs no saving
+    else:
+        saved_version = version
+    return True
 
-FILENAME = "params.json"
+async def persist_task():
+    while True:
+        await params_dirty.wait()
+        params_dirty.clear()
+        # coalesce bursts (e.g. a held NEXT on a slider) into one write
+        while True:
+            quiet = time.ticks_diff(time.ticks_ms(), params_changed_ms)
+            if quiet >= PERSIST_QUIET_MS:
+                break
+            await asyncio.sleep_ms(PERSIST_QUIET_MS - quiet)
+        if params_version != saved_version and not settings_readonly:
+            try:
+                save_settings()
+            except OSError as e:
+                print("Saving settings failed: {}".format(e))
+        while store_pending:
+            key, value = store_pending.popitem()
+            try:
+                store.put(key, value)
+            except OSError as e:
+                print("Saving {} failed: {}".format(key, e))
 
-def save_params():
-    data = {name: param.value for name, param in params.items()}
-    with open(FILENAME, "w") as f:
-        json.dump(data, f)
+# -----------------------
+# Legacy files
+# -----------------------
+def migrate_snake_high(score):
+    # the old high score opens the leaderboard
+    if score and SNAKE_TOP_KEY not in store:
+        try:
+            store.put(SNAKE_TOP_KEY, struct.pack("<H", min(score, 0xFFFF)))
+        except OSError as e:
+            print("Saving {} failed: {}".format(SNAKE_TOP_KEY, e))
 
-def load_params():
+def load_legacy_params():
     try:
-        with open(FILENAME, "r") as f:
+        with open(LEGACY_PARAMS_FILE, "r") as f:
             data = json.load(f)
             for name, val in data.items():
                 if name in params:
                     params[name].value = val
-    except OSError:
-        # file not found, keep defaults
+            migrate_snake_high(data.get("SnakeHighScore", 0))
+    except (OSError, ValueError):
+        # file not found or damaged, keep defaults
         pass
 
-# -----------------------
-# Username and ID
-# -----------------------
-def load_username():
+def load_legacy_username():
     try:
-        with open("yourname.txt") as f:
+        with open(LEGACY_NAME_FILE) as f:
             return f.read().strip() or None
     except OSError:
         return None
 
-USERNAME = load_username()
-
-ID_FILENAME = "id.txt"
-
 def is_valid_hex_id(s):
     """Check if s is a 12-character hex string (6 bytes)."""
     if len(s) != 12:
@@ -154,37 +378,65 @@ def is_valid_hex_id(s):
     except ValueError:
         return False
 
-def load_or_create_device_id():
-    device_id = None
-    need_create = True
-
-    # try to read existing ID
+def load_legacy_device_id():
     try:
-        with open(ID_FILENAME, "r") as f:
+        with open(LEGACY_ID_FILE, "r") as f:
             hex_str = f.read().strip().upper()
             if is_valid_hex_id(hex_str):
-                device_id = hex_str
-                need_create = False
+                return hex_str
     except OSError:
         pass  # file does not exist
-
-    if need_create:
-        # generate new 6-byte ID
-        random_bytes = bytes([urandom.getrandbits(8) for _ in range(6)])
-        hex_str = ubinascii.hexlify(random_bytes).decode().upper()
-        device_id = hex_str
-
-        # store to file
+    return None
+
+def create_device_id():
+    # generate new 6-byte ID
+    random_bytes = bytes([urandom.getrandbits(8) for _ in range(6)])
+    return ubinascii.hexlify(random_bytes).decode().upper()
+
+def migrate_settings():
+    """First boot without a settings record: take over the old files."""
+    global device_id
+    load_legacy_params()
+    name = load_legacy_username()
+    if name:
+        set_username(name)
+    device_id = load_legacy_device_id() or create_device_id()
+    try:
+        save_settings()
+    except OSError as e:
+        print("Saving settings failed: {}".format(e))
+        return
+    for f in (LEGACY_PARAMS_FILE, LEGACY_NAME_FILE, LEGACY_ID_FILE):
         try:
-            with open(ID_FILENAME, "w") as f:
-                f.write(device_id)
+            os.remove(f)
         except OSError:
-            pass  # handle write error
+            pass
 
-    return device_id
+def init_persistence():
+    try:
+        store.open()
+    except OSError as e:
+        print("Opening {} failed: {}".format(STORE_FILE, e))  # runs without it
+    if not load_settings():
+        migrate_settings()
+    print("Device ID: {}".format(device_id))
+    print("Username: {}".format(USERNAME))
+# -----------------------
+# WiFi
+# -----------------------
+wifi = None  # WifiManager, created on first use
+
+def get_wifi():
+    """The WiFi manager shared by all network features. The network stack
+    is only imported, and the manager task started, on the first call."""
+    global wifi
+    if wifi is None:
+        from wifimgr import WifiManager
+        wifi = WifiManager(SSID, PASSWORD, store, idle_ms=WIFI_IDLE_MS,
+                           connect_ms=WIFI_CONNECT_MS)
+        asyncio.create_task(wifi.run())
+    return wifi
 
-device_id = load_or_create_device_id()
-print("Device ID: {}".format(device_id))
 # -----------------------
 # Hardware init
 # -----------------------
@@ -198,15 +450,17 @@ def init_neopixels():
 # -----------------------
 # Button IRQ handling
 # -----------------------
-def _push_button(btn_id):
-    global last_button, last_activity
-    last_button = btn_id
+# All events enter input_queue from scheduled callbacks only, so pushes never
+# interleave; ui_task drains the queue in order.
+def _push_button(btn_id, edge, ts, count=1):
+    global last_activity
     last_activity = time.ticks_ms()
+    input_queue.push(btn_id, edge, ts, count)
     if button_event:
         button_event.set()
 
 def _schedule_push(btn):
-    btn_id, pin_state = btn
+    btn_id, pin_state, ts = btn
     now = time.ticks_ms()
     if time.ticks_diff(now, _last_event_ms.get(btn_id, 0)) < DEBOUNCE_MS:
         return
@@ -214,112 +468,268 @@ def _schedule_push(btn):
 
     if pin_state == 0:  # pressed
         btn_state[btn_id] = 1
-        _push_button(btn_id)
+        if tracer:
+            tracer.arrive(ts)
+        _push_button(btn_id, EDGE_PRESS, ts)
         # start repeat task for Next/Prev
         if btn_id in (BTN_NEXT, BTN_PREV):
             repeat_tasks[btn_id] = asyncio.create_task(_repeat_task(btn_id))
+        elif btn_id == BTN_BACK:
+            repeat_tasks[btn_id] = asyncio.create_task(_long_task(btn_id))
     else:  # released
         btn_state[btn_id] = 0
+        _push_button(btn_id, EDGE_RELEASE, ts)
         t = repeat_tasks.pop(btn_id, None)
         if t:
             t.cancel()
 
+def repeat_step(held_ms):
+    """Steps carried by one repeat event after holding for held_ms."""
+    shift = held_ms // REPEAT_ACCEL_MS
+    step = 1 << shift if shift < 16 else REPEAT_MAX_STEP
+    return min(step, REPEAT_MAX_STEP)
+
+def _schedule_repeat(btn_id):
+    if btn_state.get(btn_id):
+        ts = time.ticks_us()
+        if tracer:
+            tracer.arrive(ts)
+        held = time.ticks_diff(time.ticks_ms(), _repeat_start[btn_id])
+        _push_button(btn_id, EDGE_REPEAT, ts, repeat_step(held))
+
+def _schedule_long(btn_id):
+    if btn_state.get(btn_id):
+        _push_button(btn_id, EDGE_LONG, time.ticks_us())
+
 def make_irq(btn_id):
     def handler(pin):
-        micropython.schedule(_schedule_push, (btn_id, pin.value()))
+        micropython.schedule(_schedule_push, (btn_id, pin.value(), time.ticks_us()))
     return handler
 
+BUTTON_CFG = [(BTN_NEXT_PIN, BTN_NEXT),
+              (BTN_PREV_PIN, BTN_PREV),
+              (BTN_SELECT_PIN, BTN_SELECT),
+              (BTN_BACK_PIN, BTN_BACK)]
+
 def setup_buttons():
-    cfg = [(BTN_NEXT_PIN, BTN_NEXT),
-           (BTN_PREV_PIN, BTN_PREV),
-           (BTN_SELECT_PIN, BTN_SELECT),
-           (BTN_BACK_PIN, BTN_BACK)]
-    for pin_num, btn_id in cfg:
+    for pin_num, btn_id in BUTTON_CFG:
         p = Pin(pin_num, Pin.IN)  # external pull-ups
         p.irq(trigger=Pin.IRQ_FALLING|Pin.IRQ_RISING, handler=make_irq(btn_id))
 
+# -----------------------
+# Button scanning (INPUT_SCAN)
+# -----------------------
+def _scan_push(btn_id, edge, ts, count):
+    # scan_task is the only producer in this mode, no scheduling needed
+    if tracer and edge in (EDGE_PRESS, EDGE_REPEAT):
+        tracer.arrive(ts)
+    _push_button(btn_id, edge, ts, count)
+
+def setup_scanner():
+    pins = [Pin(pin_num, Pin.IN) for pin_num, _ in BUTTON_CFG]  # external pull-ups
+    ids = [btn_id for _, btn_id in BUTTON_CFG]
+    return ButtonScanner(pins, ids, _scan_push, SCAN_MS, SCAN_DEBOUNCE_MS,
+                         (BTN_NEXT, BTN_PREV), REPEAT_DELAY, REPEAT_INTERVAL,
+                         repeat_step, (BTN_BACK,), LONG_PRESS_MS)
+
+async def scan_task(scanner):
+    while True:
+        scanner.scan(time.ticks_ms())
+        await asyncio.sleep_ms(SCAN_MS)
+
 async def _repeat_task(btn_id):
     try:
         await asyncio.sleep_ms(REPEAT_DELAY)
+        _repeat_start[btn_id] = time.ticks_ms()
         while btn_state[btn_id]:
-            _push_button(btn_id)
+            # hand over to scheduler context so pushes never interleave
+            try:
+                micropython.schedule(_schedule_repeat, btn_id)
+            except RuntimeError:
+                pass  # schedule queue full: drop this tick
             await asyncio.sleep_ms(REPEAT_INTERVAL)
     except asyncio.CancelledError:
         return
 
+async def _long_task(btn_id):
+    try:
+        await asyncio.sleep_ms(LONG_PRESS_MS)
+        if btn_state[btn_id]:
+            try:
+                micropython.schedule(_schedule_long, btn_id)
+            except RuntimeError:
+                pass  # schedule queue full: no long press this time
+    except asyncio.CancelledError:
+        return
+
 # -----------------------
 # Screen base class
 # -----------------------
 class Screen:
+    cacheable = True    # kept alive by the screen cache between visits
+    auto_render = True  # ui_task renders after input; False if the screen draws itself
+    led_fps = None      # LED frame rate cap while shown, for screens that keep the CPU busy
+
     def __init__(self, oled):
         self.oled = oled
 
+    def on_enter(self):
+        # called when a cached instance becomes the current screen again
+        pass
+
     def render(self):
         pass
 
-    async def handle_button(self, btn):
+    def invalidate(self):
+        # next render() must redraw the whole display (screen was re-entered)
         pass
 
-# -----------------------
-# Lights screens
-# -----------------------
-class ParamScreen(Screen):
-    def __init__(self, oled, writer, param, returnscreen, barfill=False, wraparound=False):
+    async def handle_button(self, btn, count=1):
+        # count > 1 for accelerated auto-repeat: apply that many steps at once
+        # to values and scroll positions; lists move one item per event, as
+        # a step count would wrap around a short list to a random entry
+        pass
+
+class WidgetScreen(Screen):
+    """Screen built from widgets; render() repaints and flushes only dirty ones."""
+    def __init__(self, oled):
         super().__init__(oled)
-        self.writer = writer
-        self.param = param
-        self.returnscreen = returnscreen
-        self.barfill = barfill
-        self.wraparound = wraparound
+        self.widgets = []
+        self._full = True
 
-    def render(self):
-        self.oled.fill(0)
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
 
-        val = self.param.value
-        bar_x = 0
-        bar_y = 30
-        bar_w = self.oled.width
-        bar_h = 10
-        self.oled.rect(bar_x, bar_y, bar_w, bar_h, 1)
-
-        # Knob/fill position
-        pos = bar_x + (val * (bar_w - 1)) // self.param.maxval
-        if not self.barfill:
-            self.oled.vline(pos, bar_y, bar_h, 1)
-        else:
-            self.oled.fill_rect(bar_x, bar_y, pos, bar_h, 1)
+    def invalidate(self):
+        self._full = True
 
-        # Numeric display
-        self.writer.set_textpos(self.oled, 50, 0)
-        self.writer.printstring("{}: {:3d}".format(self.param.name, val))
-        self.oled.show()
+    def update(self):
+        # --- to be customized in child classes: push state into widgets ---
+        pass
 
-    async def handle_button(self, btn):
-        if btn == BTN_NEXT and (self.wraparound or self.param.value < self.param.maxval):
-            self.param.value = (self.param.value + 1) % (self.param.maxval + 1)
-        elif btn == BTN_PREV and (self.wraparound or self.param.value > 0):
-            self.param.value = (self.param.value - 1) % (self.param.maxval + 1)
-        elif btn in (BTN_SELECT, BTN_BACK):
-            return self.returnscreen(self.oled)
-        return self
+    def render(self):
+        self.update()
+        full = self._full
+        self._full = False
+        dirty = repaint(self.oled, self.widgets, full)
+        if full:
+            self.oled.show()
+        else:
+            for w in dirty:
+                self.oled.show_rect(w.x, w.y, w.w, w.h)
 
-class BrightnessScreen(ParamScreen):
-    def __init__(self, oled):
-        super().__init__(oled, wri10, led_brightness, LightsScreen, barfill=True, wraparound=False)
+# -----------------------
+# Screen modules
+# -----------------------
+# Screens other than the menu live in the screens package and are referred
+# to as "module.Class" strings; a module is imported on first use only.
+def load_screen_class(ref):
+    if not isinstance(ref, str):
+        return ref
+    mod, cls = ref.split(".")
+    module = __import__("screens." + mod, None, None, (cls,))
+    return getattr(module, cls)
+
+def unload_screen_module(mod):
+    # a module that imported data of its own drops it in unload()
+    name = "screens." + mod
+    if name in sys.modules:
+        print("Screens: unloading {}".format(mod))
+        unload = getattr(sys.modules[name], "unload", None)
+        if unload:
+            unload()
+        del sys.modules[name]
+        package = sys.modules.get("screens")
+        if package and hasattr(package, mod):
+            delattr(package, mod)
+
+def screen_module(ref):
+    return ref.split(".")[0] if isinstance(ref, str) else None
 
-class SpeedScreen(ParamScreen):
-    def __init__(self, oled):
-        super().__init__(oled, wri10, led_speed, LightsScreen, barfill=True, wraparound=False)
+# -----------------------
+# Screen cache
+# -----------------------
+class ScreenCache:
+    """Keeps constructed screens alive, evicting least recently used ones
+    when there are too many or the heap gets tight. With SCREEN_UNLOAD the
+    module of an evicted screen is dropped too once nothing else uses it."""
+    def __init__(self, max_entries, min_free):
+        self.max_entries = max_entries
+        self.min_free = min_free
+        self.screens = []  # LRU order, most recently used last
+        self.current = None
+        self.loads = 0
+        self.unloads = 0
+
+    def get(self, ref, oled):
+        for i, s in enumerate(self.screens):
+            if s._ref == ref:
+                self.screens.append(self.screens.pop(i))
+                s.on_enter()
+                self.current = s
+                return s
+        self.trim(keep=0)
+        mod = screen_module(ref)
+        if mod and "screens." + mod not in sys.modules:
+            self.loads += 1
+        s = load_screen_class(ref)(oled)
+        s._ref = ref
+        self.current = s
+        if s.cacheable:
+            self.screens.append(s)
+            self.trim()
+        return s
+
+    def release(self, s):
+        # s was left. If it is not cached (never was, or was evicted while
+        # it was still current) it may have been its module's last user.
+        if s not in self.screens:
+            self._unload_unused(s._ref)
+
+    def _evict(self):
+        s = self.screens.pop(0)
+        self._unload_unused(s._ref)
+
+    def _unload_unused(self, ref):
+        mod = screen_module(ref)
+        if not SCREEN_UNLOAD or not mod:
+            return
+        in_use = list(self.screens)
+        if self.current is not None:
+            in_use.append(self.current)
+        for s in in_use:
+            if screen_module(s._ref) == mod:
+                return
+        unload_screen_module(mod)
+        self.unloads += 1
+
+    def trim(self, keep=1):
+        while len(self.screens) > max(keep, self.max_entries):
+            self._evict()
+        if gc.mem_free() >= self.min_free:
+            return
+        gc.collect()
+        while len(self.screens) > keep and gc.mem_free() < self.min_free:
+            print("Screen cache: evicting {}".format(type(self.screens[0]).__name__))
+            self._evict()
+            gc.collect()
 
-class SaturationScreen(ParamScreen):
-    def __init__(self, oled):
-        super().__init__(oled, wri10, led_sat, LightsScreen, barfill=False, wraparound=False)
+    def clear(self):
+        while self.screens:
+            self._evict()
+        gc.collect()
 
-class HueScreen(ParamScreen):
-    def __init__(self, oled):
-        super().__init__(oled, wri10, led_hue, LightsScreen, barfill=False, wraparound=True)
+screen_cache = ScreenCache(SCREEN_CACHE_MAX, SCREEN_CACHE_MIN_FREE)
+
+def open_screen(ref, oled):
+    """ref is a Screen class or a "module.Class" string from the screens package."""
+    return screen_cache.get(ref, oled)
 
-class ListScreen(Screen):
+# -----------------------
+# List screen
+# -----------------------
+class ListScreen(WidgetScreen):
     def __init__(self, oled, title, items):
         super().__init__(oled)
         self.title = title
@@ -333,7 +743,11 @@ class ListScreen(Screen):
         self.line_height = self.listwriter.font.height()
         self.rows = (self.oled.height - 20) // self.line_height  # room below header
 
-    async def handle_button(self, btn):
+        self.add(Label(self.headerwriter, 0, 0, oled.width, text=title))
+        self.row_widgets = [self.add(ListRow(self.listwriter, 0, 20 + row * self.line_height, oled.width))
+                            for row in range(self.rows)]
+
+    async def handle_button(self, btn, count=1):
         if btn == BTN_NEXT:
             self.index = (self.index + 1) % len(self.items)
         elif btn == BTN_PREV:
@@ -351,19 +765,13 @@ class ListScreen(Screen):
 
         return self
 
-    def render(self):
-        self.oled.fill(0)
-        self.headerwriter.set_textpos(self.oled, 0, 0)
-        self.headerwriter.printstring(self.title)
-
-        visible = range(self.offset, min(len(self.items), self.offset + self.rows))
-        for row, i in enumerate(visible):
-            y = 20 + row * self.line_height
-            prefix = ">" if i == self.index else " "
-            self.listwriter.set_textpos(self.oled, y, 0)
-            self.listwriter.printstring("{}{}".format(prefix, self.items[i][0]))
-
-        self.oled.show()
+    def update(self):
+        for row, widget in enumerate(self.row_widgets):
+            i = self.offset + row
+            if i < len(self.items):
+                widget.set(self.items[i][0], i == self.index)
+            else:
+                widget.set("", False)
 
     # --- to be customized in child classes ---
     def on_select(self, index):
@@ -372,628 +780,61 @@ class ListScreen(Screen):
     def on_back(self):
         pass
 
-class EffectScreen(ListScreen):
-    def __init__(self, oled):
-        super().__init__(oled, "LED effects", led_effects)
-
-    def on_select(self, index):
-        global led_effect
-        led_effect.value = index
-        return self
-
-    def on_back(self):
-        return LightsScreen(self.oled)
-
-lights_screens = [("Effects", EffectScreen),
-                  ("Brightness", BrightnessScreen),
-                  ("Hue", HueScreen),
-                  ("Saturation", SaturationScreen),
-                  ("Speed", SpeedScreen)]
-
-class LightsScreen(ListScreen):
-    def __init__(self, oled):
-        super().__init__(oled, "Lights", lights_screens)
-
-    def on_select(self, index):
-        cls = lights_screens[index][1]
-        return cls(self.oled)
-
-    def on_back(self):
-        save_params()
-        return MenuScreen(self.oled)
 
 # -----------------------
-# Badge screens
+# Diagnostics screen
 # -----------------------
-class FetchNameScreen(Screen):
-    def __init__(self, oled):
-        super().__init__(oled)
-        self.oled = oled
-        self.index = 0  # only one item
-        self.message = ""  # status message to display
-        self.wlan = None
-
-    async def handle_button(self, btn):
-        global username_lines, USERNAME
-        if btn == BTN_SELECT:
-            self.message = "Connecting WiFi..."
-            self.render()
-            try:
-                await self._connect_wifi()
-            except Exception as e:
-                self.message = f"WiFi error: {e}"
-                self.render()
-                return self
 
-            self.message = "Fetching name..."
-            self.render()
-            try:
-                name = await self._fetch_name()
-                self.message = f"Name: {name}"
-                self.render()
-                # Reset name lines and store to yourname.txt
-                USERNAME = name
-                username_lines = None
-                try:
-                    with open("yourname.txt", "w") as f:
-                        f.write(name)
-                except OSError as e:
-                    self.message += f" (save error: {e})"
-                    self.render()
-            except Exception as e:
-                self.message = f"Fetch error: {e}"
-                self.render()
-        elif btn == BTN_BACK:
-            await self._disconnect_wifi()
-            return BadgeScreen(oled)
-
-        return self
-
-    async def _connect_wifi(self):
-        if not self.wlan:
-            self.wlan = network.WLAN(network.STA_IF)
-        self.wlan.active(True)
-        if not self.wlan.isconnected():
-            self.wlan.connect(SSID, PASSWORD)
-            for _ in range(20):  # wait up to ~10 seconds
-                await asyncio.sleep(0.5)
-                if self.wlan.isconnected():
-                    return
-            raise RuntimeError("Could not connect to WiFi")
-
-    async def _disconnect_wifi(self):
-        if not self.wlan:
-            return
-        try:
-            self.wlan.disconnect()
-        except OSError:
-            pass
-        for _ in range(20):  # up to ~10 seconds
-            if not self.wlan.isconnected():
-                break
-            await asyncio.sleep(0.5)
-        self.wlan.active(False)
-
-    async def _fetch_name(self):
-        # parse URL
-        proto, rest = URL.split("://", 1)
-        if "/" in rest:
-            host, base_path = rest.split("/", 1)
-            base_path = "/" + base_path
-        else:
-            host, base_path = rest, ""
-
-        port = 443 if proto == "https" else 80
-
-        # resolve host
-        addr_info = socket.getaddrinfo(host, port)
-        addr = addr_info[0][-1]
-        s = socket.socket()
-        s.connect(addr)
-
-        if proto == "https":
-            s = ssl.wrap_socket(s, server_hostname=host)
-
-        path = base_path + "/getname/" + device_id
-        req = "GET {} HTTP/1.0\r\nHost: {}\r\n\r\n".format(path, host)
-        s.send(req.encode())
-
-        # read response
-        resp = b""
-        while True:
-            data = s.recv(512)
-            if not data:
-                break
-            resp += data
-        s.close()
-
-        # extract body
-        body = resp.split(b"\r\n\r\n", 1)[-1]
-        try:
-            data = json.loads(body)
-        except ValueError:
-            raise RuntimeError("Invalid JSON")
-
-        # Check for error
-        if "error" in data:
-            raise RuntimeError("{}".format(data.get("error","")))
-
-        # compare IDs case-insensitively
-        if data.get("id", "").upper() != device_id.upper() or "name" not in data:
-            raise RuntimeError("Unexpected response")
-
-        return data["name"].strip()
-
-    def render(self):
-        self.oled.fill(0)
-
-        # header = device_id
-        wri6.set_textpos(self.oled, 0, 0)
-        wri6.printstring("ID: {}".format(device_id))
-
-        if self.message:
-            y = wri6.font.height() + 2
-            wri6.set_textpos(self.oled, y, 0)
-            wri6.printstring(self.message)
-        else:
-            # menu item
-            y = wri6.font.height() + 2
-            wri6.set_textpos(self.oled, y, 0)
-            wri6.printstring(URL_QR)
-
-            # menu item
-            y += wri6.font.height() + 2
-            wri6.set_textpos(self.oled, y, 0)
-            wri6.printstring(">Fetch name")
-
-        self.oled.show()
-
-class CodeRepoScreen(Screen):
-    async def handle_button(self, btn):
-        if btn in (BTN_SELECT, BTN_BACK):
-            return BadgeScreen(oled)
-        return self
-
-    def render(self):
-        self.oled.fill(0)
-
-        wri10.set_textpos(self.oled, 0, 0)
-        wri10.printstring("Badge code git")
-
-        y = wri10.font.height() + 4
-        wri6.set_textpos(self.oled, y, 0)
-        wri6.printstring("github.com/ks000/ bsides_badge")
-
-        self.oled.show()
-
-badge_screens = [("Fetch Name", FetchNameScreen),
-                 ("Code git", CodeRepoScreen)]
-
-class BadgeScreen(ListScreen):
-    def __init__(self, oled):
-        super().__init__(oled, "Badge setup", badge_screens)
-
-    def on_select(self, index):
-        cls = badge_screens[index][1]
-        return cls(self.oled)
-
-    def on_back(self):
-        save_params()
-        return MenuScreen(self.oled)
-
-# -----------------------
-# Sponsors screens
-# -----------------------
-
-class SponsorsScreen(Screen):
-    def __init__(self, oled):
-        super().__init__(oled)
-
-        # Import logos dynamically
-        LOGO_FOLDER = "logos"
-        if LOGO_FOLDER not in sys.path:
-            sys.path.append(LOGO_FOLDER)
-        logo_files = sorted([f for f in os.listdir(LOGO_FOLDER) if f.endswith(".py")])
-
-        self.logos = []
-        self.current_logo = 0
-        for f in logo_files:
-            module_name = f[:-3]  # strip '.py'
-            mod = __import__(module_name)
-            if hasattr(mod, "fb"):
-                self.logos.append(mod.fb)
-            else:
-                print(f"Warning: {module_name} has no attribute 'fb'")
-
-        if not self.logos:
-            raise RuntimeError("No valid logos found!")
-
-    def render(self):
-        self.oled.fill(0)
-        self.oled.blit(self.logos[self.current_logo], 0, 0)
-        self.oled.show()
-
-    async def handle_button(self, btn):
-        if btn == BTN_NEXT:
-            self.current_logo = (self.current_logo + 1) % len(self.logos)
-        elif btn == BTN_PREV:
-            self.current_logo = (self.current_logo - 1) % len(self.logos)
-        if btn == BTN_BACK:
-            return MenuScreen(self.oled)
-        return self
-
-# -----------------------
-# Text screens
-# -----------------------
-
-class TextScreen(Screen):
-    def __init__(self, oled, writer, text):
-        super().__init__(oled)
-        self.wri = writer
-
-        # wrap long text
-        self.text = self._wrap_text(text)
-
-        # metrics
-        self.line_height = self.wri.font.height()
-        self.rows = oled.height // self.line_height
-        self.offset = 0
-
-    def _wrap_text(self, text):
-        lines = []
-        # split paragraphs by explicit newline
-        for para in text.split("\n"):
-            words = para.split()
-            line = ""
-            for word in words:
-                test_line = (line + " " + word).strip()
-                if self.wri.stringlen(test_line) <= self.oled.width:
-                    line = test_line
-                else:
-                    lines.append(line)
-                    line = word
-            if line:
-                lines.append(line)
-            if para == "":  # preserve blank lines
-                lines.append("")
-        return lines
-
-    def render(self):
-        self.oled.fill(0)
-        y = 0
-        for i in range(self.offset, min(len(self.text), self.offset + self.rows)):
-            self.wri.set_textpos(self.oled, y, 0)
-            self.wri.printstring(self.text[i])
-            y += self.line_height
-        self.oled.show()
-
-    async def handle_button(self, btn):
-        if btn == BTN_NEXT and self.offset + self.rows < len(self.text):
-            self.offset += 1
-        elif btn == BTN_PREV and self.offset > 0:
-            self.offset -= 1
-        elif btn == BTN_BACK:
-            return MenuScreen(self.oled)
-        return self
-
-class AboutScreen(TextScreen):
-    def __init__(self, oled):
-        text = (
-            "BSides is a worldwide infosec event format, organized by the local infosec community in every city it is held. BSides Tallinn is organized by a non-profit core-team, volunteers and sponsors since 2021.\n\n"
-            "One core difference of all BSides events is that the talks on the stage are proposed by anyone and selected by a program committee - professionals representing the organizers, private companies, academia, the state, freelancers.\n\n"
-            "Talks, presentations, demos, proof-of-concepts across a very broad spectrum of infosec topics. All of the content is proposed by community members."
-        )
-        super().__init__(oled, wri6, text)
-
-
-class OurteamScreen(TextScreen):
-    def __init__(self, oled):
-        text = (
-            "Organizers: Hans, Silvia, Matis, Liisa, Johanna, Martti, Rainer, Kadi\n\n"
-            "Badge: Konstantin\n\n"
-            "Volunteers: Elis, Elle, Kristo, Merli, Hanna, Liam, Sten"
-        )
-        super().__init__(oled, wri6, text)
-
-class SnakeScreen(Screen):
-    """
-    Snake for 128x64 SSD1306.
-    - Grid: 4x4 px cells
-    - HUD row at top with boundary line; full border around playfield.
-    - Controls:
-        NEXT  -> turn right
-        PREV  -> turn left
-        SELECT-> pause/resume (or restart on game over)
-        BACK  -> exit to menu
-
-    NOTE: In ui_task(), do not auto-render when current screen is SnakeScreen.
-    """
-    CELL = 4
-    DIRS = [(1,0), (0,1), (-1,0), (0,-1)]  # R, D, L, U
-
-    def __init__(self, oled):
-        super().__init__(oled)
-
-        # ----- GEOMETRY -----
-        self.HUD_H = wri6.font.height()                 # your build reports 14
-        self.GRID_W = OLED_WIDTH // self.CELL           # 32
-        self.GRID_H = (OLED_HEIGHT - self.HUD_H) // self.CELL  # e.g. 12
-        self.GRID_Y0 = self.HUD_H                       # playfield starts below HUD
-
-        # Playfield pixel bounds
-        self.x_left   = 0
-        self.x_right  = self.oled.width - 1            # 127
-        self.y_top    = self.GRID_Y0
-        self.y_bot    = self.GRID_Y0 + self.GRID_H * self.CELL - 1  # e.g. 61
-
-        # ----- GAME STATE -----
-        self.running = True
-        self.paused = False
-        self.tick_ms_base = 180
-        self.tick_ms_min  = 70
-        self.tick_ms = self.tick_ms_base
-        self.score = 0
-
-        try:
-            self.high_score = snake_high_score.value
-        except NameError:
-            self.high_score = 0
-
-        self.dir_idx = 0  # right
-        cx = self.GRID_W // 2
-        cy = self.GRID_H // 2
-        self.snake = [(cx, cy), (cx-1, cy), (cx-2, cy), (cx-3, cy)]
-        self.food = self._rand_empty_cell()
-        self.game_over = False
-
-        # Start loop last
-        self._task = asyncio.create_task(self._loop())
-        self.render()
-
-    # ---------- helpers ----------
-    def _cell_free(self, x, y):
-        return (x, y) not in self.snake
-
-    def _rand_empty_cell(self):
-        for _ in range(200):
-            x = urandom.getrandbits(5) % self.GRID_W     # 0..31
-            y = urandom.getrandbits(5) % self.GRID_H     # 0..GRID_H-1
-            if self._cell_free(x, y):
-                return (x, y)
-        for yy in range(self.GRID_H):
-            for xx in range(self.GRID_W):
-                if self._cell_free(xx, yy):
-                    return (xx, yy)
-        return (0, 0)
-
-    def _turn_left(self):
-        self.dir_idx = (self.dir_idx - 1) % 4
-
-    def _turn_right(self):
-        self.dir_idx = (self.dir_idx + 1) % 4
-
-    def _advance(self):
-        dx, dy = self.DIRS[self.dir_idx]
-        hx, hy = self.snake[0]
-        nx, ny = hx + dx, hy + dy
-
-        # grid-bounds collision
-        if nx < 0 or nx >= self.GRID_W or ny < 0 or ny >= self.GRID_H:
-            self._end_game()
-            return
-
-        # self collision
-        if (nx, ny) in self.snake:
-            self._end_game()
-            return
-
-        # move
-        self.snake.insert(0, (nx, ny))
-
-        # eat
-        if (nx, ny) == self.food:
-            self.score += 1
-            self.tick_ms = max(self.tick_ms_min, self.tick_ms_base - self.score * 6)
-            self.food = self._rand_empty_cell()
-        else:
-            self.snake.pop()
-
-    def _end_game(self):
-        self.game_over = True
-        if self.score > self.high_score:
-            self.high_score = self.score
-            try:
-                snake_high_score.value = self.high_score
-                save_params()
-            except Exception:
-                pass
-        # show overlay immediately
-        self.render()
-
-    async def _loop(self):
-        try:
-            while self.running:
-                if not self.paused and not self.game_over:
-                    self._advance()
-                    self.render()
-                await asyncio.sleep_ms(self.tick_ms)
-        except asyncio.CancelledError:
-            return
-
-    # ---------- drawing ----------
-    def _draw_hud(self):
-        # Clear HUD band
-        self.oled.fill_rect(0, 0, self.oled.width, self.HUD_H, 0)
-
-        # Left: score
-        wri6.set_textpos(self.oled, 0, 0)
-        wri6.printstring("SCORE:{:d}".format(self.score))
-
-        # Right: high score
-        hi_txt = "HI:{:d}".format(self.high_score)
-        x_hi = self.oled.width - wri6.stringlen(hi_txt)
-        wri6.set_textpos(self.oled, 0, x_hi)
-        wri6.printstring(hi_txt)
-
-        # Top border (under HUD)
-        self.oled.hline(0, self.HUD_H - 1, self.oled.width, 1)
-
-    def render(self):
-        self.oled.fill(0)
-
-        # HUD
-        self._draw_hud()
-
-        # Food (offset by HUD)
-        fx, fy = self.food
-        self.oled.fill_rect(fx*self.CELL, self.GRID_Y0 + fy*self.CELL, self.CELL, self.CELL, 1)
-
-        # Snake
-        for i, (x, y) in enumerate(self.snake):
-            px = x * self.CELL
-            py = self.GRID_Y0 + y * self.CELL
-            if i == 0:
-                self.oled.fill_rect(px, py, self.CELL, self.CELL, 1)
-            else:
-                self.oled.rect(px, py, self.CELL, self.CELL, 1)
-
-        # Overlays
-        if self.paused:
-            self._overlay_center("PAUSED")
-        elif self.game_over:
-            self._overlay_gameover()
-
-        # --- Draw playfield borders LAST so they stay visible ---
-        # Left/right verticals span the full playfield height.
-        self.oled.vline(self.x_left,  self.y_top, self.y_bot - self.y_top + 1, 1)
-        self.oled.vline(self.x_right, self.y_top, self.y_bot - self.y_top + 1, 1)
-        # Bottom border
-        self.oled.hline(0, self.y_bot, self.oled.width, 1)
-
-        self.oled.show()
-
-    def _overlay_center(self, text):
-        """Draw a single-line centered overlay; safely clamps width."""
-        pad = 2
-        fh = wri6.font.height()
-        max_text_w = self.oled.width - 2 * pad
-
-        # Clamp/ellipsize if too wide
-        if wri6.stringlen(text) > max_text_w:
-            base = text
-            while base and wri6.stringlen(base + "...") > max_text_w:
-                base = base[:-1]
-            text = (base + "...") if base else "..."
-
-        tw = wri6.stringlen(text)
-        box_w = min(self.oled.width, tw + 2 * pad)
-        box_h = fh + 2 * pad
-
-        x = (self.oled.width - box_w) // 2
-        if x < 0: x = 0
-        y = self.GRID_Y0 + (self.GRID_H * self.CELL - box_h) // 2
-        if y < self.GRID_Y0: y = self.GRID_Y0
-
-        # box
-        self.oled.fill_rect(x, y, box_w, box_h, 0)
-        self.oled.rect(x, y, box_w, box_h, 1)
-
-        # text
-        tw = wri6.stringlen(text)  # recalc in case truncated
-        tx = x + (box_w - tw) // 2
-        if tx < 0: tx = 0
-        wri6.set_textpos(self.oled, y + pad, tx)
-        wri6.printstring(text)
-
-    def _overlay_gameover(self):
-        """Two-line centered overlay that always fits."""
-        lines = ["GAME OVER", "SELECT=Restart"]
-        pad = 2
-        gap = 1
-        fh = wri6.font.height()
-
-        # Ellipsize each line if needed
-        trimmed = []
-        for s in lines:
-            if wri6.stringlen(s) <= self.oled.width - 2 * pad:
-                trimmed.append(s)
-            else:
-                base = s
-                while base and wri6.stringlen(base + "...") > self.oled.width - 2 * pad:
-                    base = base[:-1]
-                trimmed.append((base + "...") if base else "...")
-        lines = trimmed
-
-        max_line_w = max(wri6.stringlen(s) for s in lines)
-        box_w = min(self.oled.width, max_line_w + 2 * pad)
-        box_h = 2 * fh + gap + 2 * pad
-
-        x = (self.oled.width - box_w) // 2
-        if x < 0: x = 0
-        y = self.GRID_Y0 + (self.GRID_H * self.CELL - box_h) // 2
-        if y < self.GRID_Y0: y = self.GRID_Y0
-
-        # box
-        self.oled.fill_rect(x, y, box_w, box_h, 0)
-        self.oled.rect(x, y, box_w, box_h, 1)
-
-        # lines
-        ty = y + pad
-        for s in lines:
-            tw = wri6.stringlen(s)
-            tx = x + (box_w - tw) // 2
-            if tx < 0: tx = 0
-            wri6.set_textpos(self.oled, ty, tx)
-            wri6.printstring(s)
-            ty += fh + gap
-
-    # ---------- input ----------
-    async def handle_button(self, btn):
-        if not self.game_over and not self.paused:
-            if btn == BTN_NEXT:
-                self._turn_right()
-            elif btn == BTN_PREV:
-                self._turn_left()
-
-        if btn == BTN_SELECT:
-            if self.game_over:
-                # cancel old loop before restart
-                try:
-                    if self._task:
-                        self._task.cancel()
-                        await asyncio.sleep_ms(0)
-                except Exception:
-                    pass
-                # re-init fresh
-                self.__init__(self.oled)
-                return self
-            else:
-                self.paused = not self.paused
-                self.render()
-                return self
-
-        if btn == BTN_BACK:
-            self.running = False
-            try:
-                if self._task:
-                    self._task.cancel()
-            except Exception:
-                pass
-            return MenuScreen(self.oled)
-
-        return self
+def input_diag_lines():
+    q = input_queue
+    return ["Input ev{} drop{} merge{}".format(q.pushed, q.dropped, q.coalesced),
+            "Input wait max {}us".format(q.wait_max_us)]
+
+def cache_diag_lines():
+    return ["Screens cached {}".format(len(screen_cache.screens)),
+            "Modules load{} unload{}".format(screen_cache.loads, screen_cache.unloads),
+            "Heap free {}".format(gc.mem_free())]
+
+def latency_diag_lines():
+    return tracer.lines() if tracer else ["Latency tracing off"]
+
+def params_diag_lines():
+    st = settings_store
+    return ["Params saved{} pending{}{}".format(params_saves, params_version != saved_version,
+                                                " readonly" if settings_readonly else ""),
+            "Settings slot{} seq{} bad{}".format(st.slot, st.seq, st.errors)] + store.lines("Store")
+
+def led_diag_lines():
+    if not led_out:
+        return []
+    return ["LED frames sent{} same{}".format(led_out.written, led_out.skipped),
+            "LED rebuilt pal{} lut{}".format(palette.rebuilds, led_out.rebuilds)] + \
+           led_pacer.lines("LED") + led_layers.lines("LED")
+
+def wifi_diag_lines():
+    return wifi.lines("WiFi") if wifi else ["WiFi not used"]
+
+# each source returns a list of text lines; subsystems append their own
+diag_sources = [bootlog.lines, input_diag_lines, cache_diag_lines, latency_diag_lines,
+                led_diag_lines, params_diag_lines, wifi_diag_lines]
+
+def diag_text():
+    lines = []
+    for source in diag_sources:
+        lines.extend(source())
+    return "\n".join(lines)
 
 # -----------------------
 # Menu screen
 # -----------------------
 
 class MenuScreen(Screen):
-    items = [("About", AboutScreen),
-             ("Sponsors", SponsorsScreen),
-             ("Our team", OurteamScreen),
-             ("Lights", LightsScreen),
-             ("Badge", BadgeScreen),
-             ("Snake", SnakeScreen)]
+    items = [("About", "text.AboutScreen"),
+             ("Sponsors", "sponsors.SponsorsScreen"),
+             ("Our team", "text.OurteamScreen"),
+             ("Lights", "lights.LightsScreen"),
+             ("Badge", "badge.BadgeScreen"),
+             ("Snake", "snake.SnakeScreen")]
 
     def __init__(self, oled):
         super().__init__(oled)
@@ -1006,7 +847,7 @@ class MenuScreen(Screen):
         wri20.printstring(MenuScreen.items[self.index][0])
         self.oled.show()
 
-    async def handle_button(self, btn):
+    async def handle_button(self, btn, count=1):
         if btn == BTN_NEXT:
             self.index = (self.index+1) % len(MenuScreen.items)
             self.render()
@@ -1014,117 +855,91 @@ class MenuScreen(Screen):
             self.index = (self.index-1) % len(MenuScreen.items)
             self.render()
         elif btn == BTN_SELECT:
-            return MenuScreen.items[self.index][1](self.oled)
+            return open_screen(MenuScreen.items[self.index][1], self.oled)
         return self
 
 # -----------------------
 # NeoPixel effects
 # -----------------------
-def hsv_to_rgb(h, s, v):
-    """Convert hue [0–360], saturation [0–1], value [0–1] to RGB tuple."""
-    h = h % 360
-    c = v * s
-    x = c * (1 - abs((h / 60) % 2 - 1))
-    m = v - c
-
-    if h < 60:
-        r, g, b = c, x, 0
-    elif h < 120:
-        r, g, b = x, c, 0
-    elif h < 180:
-        r, g, b = 0, c, x
-    elif h < 240:
-        r, g, b = 0, x, c
-    elif h < 300:
-        r, g, b = x, 0, c
-    else:
-        r, g, b = c, 0, x
-
-    return (int((r + m) * 255),
-            int((g + m) * 255),
-            int((b + m) * 255))
-
-def led_eff_off(np, oldstate):
-    np.fill((0,0,0))
-    return oldstate
-
-def led_eff_rainbow(np, oldstate):
-    """Rainbow running around the circle"""
-    pos = oldstate or 0
-    for i in range(len(np)):
-        pixel_hue = ((i * 360 // len(np)) + pos) % 360
-        np[i] = hsv_to_rgb(pixel_hue, led_sat.value/100, led_brightness.value/100)
-    return (pos + led_speed.value/10) % 360
-
-def led_eff_breathe(np, oldstate):
-    """All LEDs smoothly brighten and dim"""
-    br, d = oldstate or (0, 1)
-    rgb = hsv_to_rgb(led_hue.value, led_sat.value/100, br*led_brightness.value/100)
-
-    for i in range(len(np)):
-        np[i] = rgb
-    br += d * led_speed.value / 1000
-    if br >= 1.0:
-        br = 1.0
-        d = -1
-    elif br <= 0.0:
-        br = 0.0
-        d = 1
-    return (br, d)
-
-def led_eff_comet(np, oldstate, tail=5):
-    """Single bright dot with fading tail"""
-    state = oldstate or 0
-    head_idx = int(state) % len(np)
-    fade_coeff = 0.5 + ((led_speed.maxval - led_speed.value) / led_speed.maxval * 0.4)
-    # fade all LEDs slightly
-    for i in range(len(np)):
-        np[i] = tuple(int(x * fade_coeff) for x in np[i])
-    # light the comet head
-    np[head_idx] = hsv_to_rgb(led_hue.value, led_sat.value/100, led_brightness.value/100)
-    
-    return state + led_speed.value / 100
-
-
-def led_eff_startup(np, oldstate):
-    head, phase = oldstate or (0, 0)
-
-    rgb_on = hsv_to_rgb(led_hue.value, led_sat.value/100, led_brightness.value/100)
-    rgb_off = (0,0,0)
-    for i in range(len(np)):
-        rgb = rgb_on if (i <= head) == (phase == 0) else rgb_off
-        np[i] = rgb
-    
-    if head < len(np) - 1:
-        return (head + 1, phase)
-    elif phase == 0:
-        return (0, 1)
-    else:
-        return None
+palette = None          # Palette of the strip, set up by neopixel_task()
+led_out = None          # LedOutput: gamma/brightness stage in front of the strip
+led_wake = None         # set when an LED parameter changes, wakes a sleeping neopixel_task
+led_pacer = FramePacer(NEOPIXEL_FPS)
+led_layers = Compositor()  # selected effect at the bottom, notifications on top
+
+led_changed = True  # led_* parameters changed since the LED task read them
+
+def led_param_changed(param):
+    global led_changed
+    led_changed = True
+    led_layers.invalidate()
+    if led_wake:
+        led_wake.set()
+
+for p in (led_effect, led_brightness, led_hue, led_sat, led_speed):
+    p.subscribe(led_param_changed)
+
+def led_flash(hue, count=2):
+    """Blink the ring over the running effect, e.g. to confirm an action."""
+    # opaque, so the blink also shows over a bright effect of a similar colour
+    if led_layers.add(effects.Flash(hue, count), BLEND_ALPHA, 256, transient=True) and led_wake:
+        led_wake.set()
+
+def default_led_fps_policy():
+    """LED frame rate for the current load: full rate when idle, lower while
+    input is being handled or a screen asks for it (e.g. a running game).
+    Effects are time-based, so this changes smoothness, not speed."""
+    fps = NEOPIXEL_FPS
+    if screen is not None and screen.led_fps:
+        fps = min(fps, screen.led_fps)
+    if time.ticks_diff(time.ticks_ms(), last_activity) < LED_BUSY_MS:
+        fps = min(fps, NEOPIXEL_FPS_BUSY)
+    return fps
+
+led_fps_policy = default_led_fps_policy  # hook: replace to change the policy
+
+def update_palette():
+    # effects work at full scale; brightness is applied by led_out
+    palette.update(led_sat.value * 255 // led_sat.maxval, 255)
+    led_out.set_level(led_brightness.value * 255 // led_brightness.maxval)
 
 async def neopixel_task(np):
-    global led_effect
-    global led_effects
-    global led_startup
-    t = None
-    prev_effect = 0
-    led_effects = [("Off", led_eff_off),
-                   ("Rainbow", led_eff_rainbow),
-                   ("Breathe", led_eff_breathe),
-                   ("Comet", led_eff_comet)]
+    # effects are listed in effects.registry; led_effect is the index
+    global led_startup, led_changed
+    global palette, led_out
+    palette = Palette(np.ORDER)
+    led_out = LedOutput(np)  # effects draw into its frame, not into np.buf
+    buf, n, bpp = led_out.buf, len(np), np.bpp
+    base = led_layers.add(effects.Startup() if led_startup else effects.registry[0])
+    last = time.ticks_ms()
     while True:
-        if led_startup == True:
-            t = led_eff_startup(np, t)
-            if t == None:
-                led_startup = False
-        else:
-            if prev_effect != led_effect.value:
-                t = None
-                prev_effect = led_effect.value
-            if led_effect.value in range(len(led_effects)):
-                t = led_effects[led_effect.value][1](np, t)
-        np.write()
-        await asyncio.sleep_ms(int(1000/NEOPIXEL_FPS))
+        now = time.ticks_ms()
+        dt = min(time.ticks_diff(now, last), 100)  # don't jump after a stall
+        last = now
+        if led_changed:
+            # parameters are only read after a change, not every frame
+            led_changed = False
+            update_palette()
+            hue, speed = led_hue.value, led_speed.value
+            if not led_startup:
+                selected = effects.registry[led_effect.value % len(effects.registry)]
+                if selected is not base.effect:
+                    led_layers.set_effect(base, selected)
+                    led_pacer.reset_stats()  # late/skip/jitter per effect
+        led_layers.render(buf, n, bpp, palette, hue, speed, dt)
+        if led_startup and base.effect.done:
+            led_startup = False
+            led_changed = True  # switch to the selected effect
+        led_out.write()
+        if led_layers.static:
+            # nothing will change until a parameter does
+            led_wake.clear()
+            await led_wake.wait()
+            led_pacer.resync()
+            last = time.ticks_ms()
+            continue
+        led_pacer.set_fps(led_fps_policy())
+        await led_pacer.wait()
 
 # -----------------------
 # UI manager
@@ -1134,22 +949,44 @@ screen = None
 async def ui_task(oled):
     global screen
 
+    await app_ready.wait()  # presses made during boot stay queued
     while True:
         await button_event.wait()
         button_event.clear()
-        btn = last_button
         if screen == None:
-            screen = MenuScreen(oled)
-        screen = await screen.handle_button(btn)
-
-        # Only auto-render non-Snake screens
-        if not isinstance(screen, SnakeScreen):
-            screen.render()
-
-def show_bsides_logo(oled):
-    oled.fill(0)
-    oled.blit(bsides_logo.fb, 0, 0)
-    oled.show()
+            screen = open_screen(MenuScreen, oled)
+
+        # deliver every queued press in order, then render once
+        if tracer:
+            tracer.begin()
+        switched = False
+        handled = False
+        while input_queue.pop():
+            edge = input_queue.edge
+            if edge == EDGE_LONG and input_queue.btn == BTN_BACK:
+                # the press already went back one level; holding on goes
+                # all the way to the menu
+                nxt = open_screen(MenuScreen, oled)
+            elif edge in (EDGE_PRESS, EDGE_REPEAT):
+                nxt = await screen.handle_button(input_queue.btn, input_queue.count)
+            else:
+                continue  # screens only act on presses and repeats
+            handled = True
+            if nxt is not screen:
+                prev = screen
+                screen = nxt
+                screen_cache.release(prev)
+                switched = True
+        if switched:
+            screen.invalidate()
+        if tracer:
+            tracer.mark(HOUT)
+
+        if handled and screen.auto_render:
+            screen.render()  # not for batches of releases only
+
+        if tracer and tracer.end(type(screen).__name__) and tracer.count % TRACE_REPORT_EVERY == 0:
+            tracer.report()
 
 def wrap_text(text, writer, max_width, max_height):
     line_height = writer.font.height()
@@ -1207,6 +1044,7 @@ def show_username(oled, name):
 
 async def inactivity_task(oled):
     global screen
+    await app_ready.wait()
     last_toggle = time.ticks_ms()
     showing_logo = True
 
@@ -1227,20 +1065,46 @@ async def inactivity_task(oled):
 # -----------------------
 # Main
 # -----------------------
+async def deferred_init():
+    # Boot stage 3, behind the splash and the running LED task. Each step
+    # yields so LED frames keep flowing between them.
+    await asyncio.sleep_ms(0)
+    init_persistence()  # loaded LED settings reach the LED task as changes
+    bootlog.mark("persistence")
+    await asyncio.sleep_ms(0)
+    init_fonts()
+    bootlog.mark("fonts")
+    await asyncio.sleep_ms(0)
+    gc.collect()
+    app_ready.set()
+    bootlog.mark("ready")
+    print("Heap free at ready: {}".format(gc.mem_free()))
+
 async def main():
-    global button_event, last_activity
+    # Boot stage 2: the splash is already up (see splash.py); start LEDs and
+    # input right away, everything else is initialised in the background.
+    global button_event, last_activity, app_ready, led_wake, params_dirty
     np = init_neopixels()
     button_event = asyncio.Event()
+    app_ready = asyncio.Event()
+    led_wake = asyncio.Event()
+    params_dirty = asyncio.Event()
     last_activity = time.ticks_ms()
 
-    setup_buttons()
-    load_params()
-    show_bsides_logo(oled)
-    print("Username: {}".format(USERNAME))
+    if tracer:
+        tracer.hook_display(oled)
+    tasks = [neopixel_task(np), deferred_init(), ui_task(oled), inactivity_task(oled),
+             persist_task()]
+    if INPUT_SCAN:
+        tasks.append(scan_task(setup_scanner()))
+    else:
+        setup_buttons()
+    bootlog.mark("leds+input")
 
-    await asyncio.gather(ui_task(oled), inactivity_task(oled), neopixel_task(np))
+    await asyncio.gather(*tasks)
 
-try:
-    asyncio.run(main())
-finally:
-    asyncio.new_event_loop()
+def run():
+    try:
+        asyncio.run(main())
+    finally:
+        asyncio.new_event_loop()
@@ -0,0 +1,200 @@
+# ahttp.py HTTP GET on uasyncio streams.
+#
+# Connecting, the TLS handshake and reading all yield to the scheduler, so
+# the UI and LEDs keep running during a request. Each phase has its own
+# timeout, and cancelling the calling task closes the connection. Only the
+# DNS lookup inside open_connection() still blocks.
+#
+# The response is parsed as it arrives: status line and headers line by
+# line through a small fixed buffer, the body with readinto() into a buffer
+# the caller allocated once.
+
+import json
+import uasyncio as asyncio
+
+
+def split_url(url):
+    """Returns (https, host, port, path) of an http(s) URL."""
+    proto, rest = url.split("://", 1)
+    if "/" in rest:
+        host, path = rest.split("/", 1)
+        path = "/" + path
+    else:
+        host, path = rest, "/"
+    https = proto == "https"
+    port = 443 if https else 80
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    return https, host, port, path
+
+
+async def _phase(coro, timeout_ms, name):
+    try:
+        return await asyncio.wait_for(coro, timeout_ms / 1000)
+    except asyncio.TimeoutError:
+        raise RuntimeError("{} timed out".format(name))
+
+
+LINE_MAX = 256    # longest status, header or chunk size line accepted
+HEADERS_MAX = 32  # header (or trailer) lines accepted
+
+
+class _Stream:
+    # Reads lines into one fixed buffer, so a long line cannot grow memory.
+    # Bytes read past the last line go to the body first.
+    def __init__(self, reader, read_ms):
+        self.reader = reader
+        self.read_ms = read_ms
+        self.buf = bytearray(LINE_MAX)
+        self.mv = memoryview(self.buf)
+        self.pos = 0  # first unread byte in buf
+        self.end = 0  # end of the bytes read into buf
+
+    async def _fill(self, timeout_ms, name):
+        # moves the unread bytes to the front and reads more behind them
+        n = self.end - self.pos
+        if self.pos:
+            self.mv[:n] = self.mv[self.pos:self.end]
+            self.pos, self.end = 0, n
+        got = await _phase(self.reader.readinto(self.mv[n:]), timeout_ms, name)
+        if got:
+            self.end += got
+        return got
+
+    async def readline(self, timeout_ms, name="Read"):
+        """Next line without its line end; None at the end of the stream."""
+        buf = self.buf
+        i = self.pos
+        while True:
+            while i < self.end:
+                if buf[i] == 10:  # \n
+                    line = bytes(self.mv[self.pos:i]).rstrip(b"\r")
+                    self.pos = i + 1
+                    return line
+                i += 1
+            if self.end - self.pos == LINE_MAX:
+                raise RuntimeError("Response too large")
+            i -= self.pos
+            if not await self._fill(timeout_ms, name):
+                if self.pos == self.end:
+                    return None
+                line = bytes(self.mv[self.pos:self.end])  # last line, no line end
+                self.pos = self.end
+                return line
+            i += self.pos
+
+    async def readinto(self, mv):
+        """Fills mv; returns the byte count, short only at end of stream."""
+        pos = min(len(mv), self.end - self.pos)
+        mv[:pos] = self.mv[self.pos:self.pos + pos]
+        self.pos += pos
+        while pos < len(mv):
+            n = await _phase(self.reader.readinto(mv[pos:]), self.read_ms, "Read")
+            if not n:
+                break
+            pos += n
+        return pos
+
+    async def at_end(self):
+        return self.pos == self.end and not await _phase(self.reader.read(1), self.read_ms, "Read")
+
+
+async def _read_chunked(stream, mv):
+    pos = 0
+    while True:
+        line = await stream.readline(stream.read_ms)
+        if line is None:
+            raise RuntimeError("Short response")
+        try:
+            size = int(line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise RuntimeError("Bad chunk")
+        if not size:
+            break
+        if pos + size > len(mv):
+            raise RuntimeError("Response too large")
+        if await stream.readinto(mv[pos:pos + size]) != size:
+            raise RuntimeError("Short response")
+        pos += size
+        await stream.readline(stream.read_ms)  # line end after the data
+    for _ in range(HEADERS_MAX):  # trailers
+        if not await stream.readline(stream.read_ms):
+            return pos
+    raise RuntimeError("Response too large")
+
+
+async def get(url, buf, progress=None, connect_ms=10000, response_ms=10000, read_ms=5000):
+    """GET url; returns (status, body) with body a memoryview into buf.
+
+    The body is read straight into buf, a preallocated bytearray whose size
+    is the largest body accepted. Status, header and chunk size lines go
+    through a LINE_MAX buffer and at most HEADERS_MAX headers are read, so
+    memory use does not depend on what the server sends. Content-Length,
+    chunked and read-to-close bodies are handled. progress(text) is called
+    as the request moves through its phases. Raises RuntimeError on
+    timeouts and malformed or oversized responses, OSError on network
+    errors."""
+    https, host, port, path = split_url(url)
+    if progress:
+        progress("Connecting...")
+    reader, writer = await _phase(asyncio.open_connection(host, port, ssl=https),
+                                  connect_ms, "Connect")
+    try:
+        writer.write("GET {} HTTP/1.0\r\nHost: {}\r\n\r\n".format(path, host).encode())
+        await _phase(writer.drain(), connect_ms, "Send")
+        if progress:
+            progress("Waiting...")
+        stream = _Stream(reader, read_ms)
+        line = await stream.readline(response_ms, "Response")
+        try:
+            status = int(line.split(None, 2)[1])
+        except (AttributeError, IndexError, ValueError):
+            raise RuntimeError("Bad response")
+        length = None
+        chunked = False
+        for _ in range(HEADERS_MAX + 1):
+            line = await stream.readline(read_ms)
+            if not line:
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    raise RuntimeError("Bad response")
+                if length < 0:
+                    raise RuntimeError("Bad response")
+            elif name == b"transfer-encoding":
+                chunked = b"chunked" in value.lower()
+        else:
+            raise RuntimeError("Response too large")
+        if progress:
+            progress("Reading...")
+        mv = memoryview(buf)
+        if chunked:
+            n = await _read_chunked(stream, mv)
+        elif length is not None:
+            if length > len(buf):
+                raise RuntimeError("Response too large")
+            n = await stream.readinto(mv[:length])
+            if n != length:
+                raise RuntimeError("Short response")
+        else:
+            # body ends when the server closes; a full buffer must be the end
+            n = await stream.readinto(mv)
+            if n == len(buf) and not await stream.at_end():
+                raise RuntimeError("Response too large")
+        return status, mv[:n]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def load_json(body):
+    """Parse a body from get() without copying it where json allows."""
+    try:
+        return json.loads(body)
+    except TypeError:
+        return json.loads(bytes(body))  # json without buffer support
@@ -0,0 +1,18 @@
+# bootlog.py Boot phase timestamps, printed over serial as they happen.
+#
+# Times are time.ticks_ms(), which counts from reset on the ESP32, so they
+# include the firmware start-up before main.py runs.
+
+import time
+
+phases = []  # [(name, ms since reset)]
+
+
+def mark(name):
+    t = time.ticks_ms()
+    phases.append((name, t))
+    print("[boot] {:6d} ms  {}".format(t, name))
+
+
+def lines():
+    return ["Boot {} {}ms".format(name, t) for name, t in phases]
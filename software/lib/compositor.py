@@ -0,0 +1,144 @@
+# compositor.py Layered LED effects.
+#
+# A Compositor runs several effects, each drawing into its own layer buffer,
+# and blends the layers bottom to top into the frame with integer blend
+# modes. Layers whose effect is static are rendered once and reused until
+# invalidate() (called when a parameter changes). The compositor is an
+# Effect itself, so a preset of layers can sit in the effect registry.
+# Time spent per frame and per layer is recorded, to keep the cost of
+# stacking layers visible.
+
+import time
+import effects
+from effects import Effect
+
+BLEND_ADD = 0    # saturating sum
+BLEND_MAX = 1    # brighter of the two per channel
+BLEND_ALPHA = 2  # layer over frame with alpha/256 opacity; 256 replaces
+
+
+class Layer:
+    def __init__(self, effect, mode, alpha, transient):
+        self.effect = effect
+        self.mode = mode
+        self.alpha = alpha
+        self.transient = transient  # dropped once the effect is done
+        self.buf = None             # allocated on the first frame
+        self.valid = False          # buf holds the current static output
+        self.cost_us = 0            # render + blend, last frame
+        self.cost_max = 0
+
+
+def blend(dst, src, mode, alpha):
+    if mode == BLEND_ADD:
+        for i in range(len(dst)):
+            v = dst[i] + src[i]
+            dst[i] = v if v < 256 else 255
+    elif mode == BLEND_MAX:
+        for i in range(len(dst)):
+            if src[i] > dst[i]:
+                dst[i] = src[i]
+    else:
+        keep = 256 - alpha
+        for i in range(len(dst)):
+            dst[i] = (dst[i] * keep + src[i] * alpha) >> 8
+
+
+class Compositor(Effect):
+    name = "Layers"
+
+    def __init__(self, max_layers=4):
+        self.max_layers = max_layers
+        self.layers = []
+        self.static = True
+        self.cost_us = 0
+        self.cost_max = 0
+        self.frames = 0
+        self.cost_sum = 0
+
+    def add(self, effect, mode=BLEND_ADD, alpha=255, transient=False):
+        """Put an effect on top; returns its Layer, or None when full."""
+        if len(self.layers) >= self.max_layers:
+            return None
+        effect.reset()
+        layer = Layer(effect, mode, alpha, transient)
+        self.layers.append(layer)
+        self.static = False
+        return layer
+
+    def remove(self, layer):
+        if layer in self.layers:
+            self.layers.remove(layer)
+            layer.effect.stop()
+
+    def set_effect(self, layer, effect):
+        """Swap the effect of a layer, restarting it."""
+        layer.effect.stop()
+        effect.reset()
+        layer.effect = effect
+        layer.valid = False
+
+    def invalidate(self):
+        for layer in self.layers:
+            layer.valid = False
+            if isinstance(layer.effect, Compositor):
+                layer.effect.invalidate()
+
+    def reset(self):
+        for layer in self.layers:
+            layer.effect.reset()
+            layer.valid = False
+
+    def stop(self):
+        for layer in self.layers:
+            layer.effect.stop()
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        t0 = time.ticks_us()
+        effects.clear(buf)
+        static = True
+        i = 0
+        while i < len(self.layers):
+            layer = self.layers[i]
+            e = layer.effect
+            t1 = time.ticks_us()
+            if layer.buf is None or len(layer.buf) != len(buf):
+                layer.buf = bytearray(len(buf))
+                layer.valid = False
+            if not (layer.valid and e.static):
+                e.render(layer.buf, n, bpp, pal, hue, speed, dt)
+                layer.valid = True
+            if e.done and layer.transient:
+                self.layers.pop(i)
+                e.stop()
+                continue
+            blend(buf, layer.buf, layer.mode, layer.alpha)
+            static = static and e.static
+            layer.cost_us = time.ticks_diff(time.ticks_us(), t1)
+            if layer.cost_us > layer.cost_max:
+                layer.cost_max = layer.cost_us
+            i += 1
+        self.static = static
+        self.cost_us = time.ticks_diff(time.ticks_us(), t0)
+        if self.cost_us > self.cost_max:
+            self.cost_max = self.cost_us
+        self.frames += 1
+        self.cost_sum += self.cost_us
+
+    def lines(self, name):
+        avg = self.cost_sum // self.frames if self.frames else 0
+        out = ["{} layers{} {}/{}us".format(name, len(self.layers), avg, self.cost_max)]
+        for layer in self.layers:
+            out.append(" {} {}/{}us".format(layer.effect.name, layer.cost_us, layer.cost_max))
+        return out
+
+
+@effects.register
+class RainbowComet(Compositor):
+    """Dimmed rainbow with a comet running over it"""
+    name = "Rainbow+Comet"
+
+    def __init__(self):
+        super().__init__()
+        self.add(effects.Rainbow(), BLEND_ALPHA, 96)
+        self.add(effects.Comet(), BLEND_MAX)
@@ -0,0 +1,213 @@
+# effects.py LED effects drawing in place into a pixel buffer.
+#
+# An effect renders one frame per call straight into a bytearray laid out
+# like the strip (bpp bytes per pixel, strip byte order) using only integer
+# math and its own preallocated state, so nothing is allocated per frame.
+# Colours come from a palette.Palette; brightness and gamma are applied
+# later by the output stage, so effects always draw at full scale.
+#
+# Animation is driven by the time since the previous frame (dt, ms), so it
+# runs at the same speed whatever frame rate the LED task manages. Speeds
+# are defined per FRAME_MS, the 50 FPS frame the effects were tuned at.
+#
+# Effects register themselves in `registry`; the index in that list is what
+# the badge stores as the selected effect, so new effects go at the end.
+
+import urandom
+
+FRAME_MS = 20
+
+registry = []
+
+
+def register(cls):
+    registry.append(cls())
+    return cls
+
+
+def clear(buf):
+    for i in range(len(buf)):
+        buf[i] = 0
+
+
+def fade(buf, factor):
+    """Scale every byte by factor/256."""
+    for i in range(len(buf)):
+        buf[i] = buf[i] * factor >> 8
+
+
+def fade_for(factor, dt):
+    """Fade factor (/256) over dt ms, given the factor per FRAME_MS."""
+    f = 256
+    for _ in range(dt // FRAME_MS):
+        f = f * factor >> 8
+    return f * (256 - (256 - factor) * (dt % FRAME_MS) // FRAME_MS) >> 8
+
+
+def repeat_first(buf, first, count, bpp):
+    """Copy pixel 0 into count pixels starting at first."""
+    for o in range(first * bpp, (first + count) * bpp, bpp):
+        for j in range(bpp):
+            buf[o + j] = buf[j]
+
+
+class Effect:
+    name = "?"
+    static = False  # frame depends on parameters only, nothing to animate
+    done = False    # one-shot effects set this when they have finished
+
+    def reset(self):
+        # called when the effect is selected; restart the animation
+        pass
+
+    def stop(self):
+        # called when the effect is deselected; release files and the like
+        pass
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        """Draw one frame of n pixels; hue 0..359, speed 0..100, dt ms
+        since the previous frame."""
+        pass
+
+
+@register
+class Off(Effect):
+    name = "Off"
+    static = True
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        clear(buf)
+
+
+@register
+class Rainbow(Effect):
+    """Rainbow running around the circle"""
+    name = "Rainbow"
+
+    def reset(self):
+        self.pos = 0  # 1/200 degree: speed/10 degrees per frame
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        shift = self.pos // 200
+        for i in range(n):
+            pal.colour_into(buf, i * bpp, i * 360 // n + shift)
+        self.pos = (self.pos + speed * dt) % 72000
+
+
+@register
+class Breathe(Effect):
+    """All LEDs smoothly brighten and dim"""
+    name = "Breathe"
+
+    def reset(self):
+        self.level = 0  # 0..20000: speed/1000 of full range per frame
+        self.dir = 1
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        pal.colour_into(buf, 0, hue, self.level * 255 // 20000)
+        repeat_first(buf, 1, n - 1, bpp)
+        self.level += self.dir * speed * dt
+        if self.level >= 20000:
+            self.level = 20000
+            self.dir = -1
+        elif self.level <= 0:
+            self.level = 0
+            self.dir = 1
+
+
+@register
+class Comet(Effect):
+    """Single bright dot with fading tail"""
+    name = "Comet"
+
+    def reset(self):
+        self.pos = 0  # 1/2000 pixel: speed/100 pixels per frame
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        # tail fades by 0.5 per frame at full speed .. 0.9 standing still
+        fade(buf, fade_for(128 + (100 - speed) * 102 // 100, dt))
+        pal.colour_into(buf, (self.pos // 2000 % n) * bpp, hue)
+        self.pos = (self.pos + speed * dt) % (n * 2000)
+
+
+@register
+class Solid(Effect):
+    name = "Solid"
+    static = True
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        pal.colour_into(buf, 0, hue)
+        repeat_first(buf, 1, n - 1, bpp)
+
+
+@register
+class Sparkle(Effect):
+    """Random pixels flash up and fade out"""
+    name = "Sparkle"
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        fade(buf, fade_for(200, dt))
+        # a new spark in (32 + speed) of 128 frames
+        if urandom.getrandbits(7) * FRAME_MS < (32 + speed) * dt:
+            i = urandom.getrandbits(8) % n
+            pal.colour_into(buf, i * bpp, hue + urandom.getrandbits(5))
+
+
+class Flash(Effect):
+    """One-shot notification: blink the whole ring count times at a hue."""
+    name = "Flash"
+
+    def __init__(self, hue, count=2, on_ms=120, off_ms=120):
+        self.hue = hue
+        self.count = count
+        self.on_ms = on_ms
+        self.period = on_ms + off_ms
+
+    def reset(self):
+        self.t = 0
+        self.done = False
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        self.t += dt
+        if self.t >= self.count * self.period:
+            self.done = True
+        if not self.done and self.t % self.period < self.on_ms:
+            pal.colour_into(buf, 0, self.hue)
+            repeat_first(buf, 1, n - 1, bpp)
+        else:
+            clear(buf)
+
+
+class Startup(Effect):
+    """Boot animation: fill the ring, then empty it; sets done at the end."""
+    name = "Startup"
+
+    def reset(self):
+        self.head = 0
+        self.phase = 0
+        self.done = False
+        self.t = 0
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        # one pixel per FRAME_MS, however often this is called
+        self.t += dt
+        while self.t >= FRAME_MS and not self.done:
+            self.t -= FRAME_MS
+            self._step(n)
+        clear(buf)
+        pal.colour_into(buf, 0, hue)
+        if self.phase == 0:
+            repeat_first(buf, 1, self.head, bpp)
+        else:
+            repeat_first(buf, self.head + 1, n - self.head - 1, bpp)
+            for j in range(bpp):
+                buf[j] = 0  # pixel 0 is already off when emptying
+
+    def _step(self, n):
+        if self.head < n - 1:
+            self.head += 1
+        elif self.phase == 0:
+            self.head = 0
+            self.phase = 1
+        else:
+            self.done = True
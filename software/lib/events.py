@@ -0,0 +1,75 @@
+# events.py Preallocated ring buffer of timestamped input events.
+#
+# push() is meant to be called from one context only (scheduled callbacks,
+# see micropython.schedule) and pop() from the UI task. The consumer can be
+# interrupted by the producer at any time, so the producer only ever fills
+# free slots, or coalesces into the newest pending slot when the consumer is
+# not reading it. Nothing is allocated after construction.
+
+from array import array
+import time
+
+EDGE_PRESS = 0
+EDGE_RELEASE = 1
+EDGE_REPEAT = 2
+EDGE_LONG = 3
+
+
+class EventQueue:
+    def __init__(self, size=32, coalesce=True):
+        self.size = size
+        self.coalesce = coalesce  # merge consecutive repeats of one button
+        self._btn = bytearray(size)
+        self._edge = bytearray(size)
+        self._count = array("H", [0] * size)
+        self._ts = array("L", [0] * size)
+        self._head = 0  # next slot to write (producer only)
+        self._tail = 0  # next slot to read (consumer only)
+
+        # last popped event
+        self.btn = 0
+        self.edge = 0
+        self.count = 0
+        self.ts = 0
+
+        # statistics
+        self.pushed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.wait_max_us = 0   # worst push -> pop delay
+
+    def push(self, btn, edge, ts, count=1):
+        """Queue an event stamped with ticks_us(). Returns False if full."""
+        head = self._head
+        if self.coalesce and edge == EDGE_REPEAT and head != self._tail:
+            last = (head - 1) % self.size
+            if last != self._tail and self._btn[last] == btn and self._edge[last] == EDGE_REPEAT:
+                self._count[last] = min(self._count[last] + count, 0xFFFF)
+                self.coalesced += 1
+                return True
+        nxt = (head + 1) % self.size
+        if nxt == self._tail:
+            self.dropped += 1
+            return False
+        self._btn[head] = btn
+        self._edge[head] = edge
+        self._count[head] = count
+        self._ts[head] = ts
+        self._head = nxt  # publish only after the slot is complete
+        self.pushed += 1
+        return True
+
+    def pop(self):
+        """Move the oldest event into btn/edge/count/ts. False when empty."""
+        tail = self._tail
+        if tail == self._head:
+            return False
+        self.btn = self._btn[tail]
+        self.edge = self._edge[tail]
+        self.count = self._count[tail]
+        self.ts = self._ts[tail]
+        self._tail = (tail + 1) % self.size
+        wait = time.ticks_diff(time.ticks_us(), self.ts)
+        if wait > self.wait_max_us:
+            self.wait_max_us = wait
+        return True
@@ -0,0 +1,39 @@
+# hsv.py Integer HSV to RGB conversion.
+#
+# Hue is 0..359, saturation and value are 0..255. The sector of the colour
+# wheel and the position inside it come from two 360-byte tables, the rest
+# is integer multiply/divide. Results are written into a caller-supplied
+# buffer, nothing is allocated per call.
+
+RGB = (0, 1, 2)  # byte offset of red, green and blue; NeoPixel.ORDER for WS2812 is GRB
+
+_SECTOR = bytes(h // 60 for h in range(360))
+_FRAC = bytes((h % 60) * 255 // 60 for h in range(360))  # 0..251 within the sector
+
+
+def hsv_into(buf, offset, h, s, v, order=RGB):
+    """Write the colour into buf[offset:offset+3], channels placed per order."""
+    if h >= 360 or h < 0:
+        h %= 360
+    f = _FRAC[h]
+    p = v * (255 - s) // 255
+    sector = _SECTOR[h]
+    if sector & 1:
+        x = v * (65025 - s * f) // 65025         # falling edge
+    else:
+        x = v * (65025 - s * (255 - f)) // 65025  # rising edge
+    if sector == 0:
+        r, g, b = v, x, p
+    elif sector == 1:
+        r, g, b = x, v, p
+    elif sector == 2:
+        r, g, b = p, v, x
+    elif sector == 3:
+        r, g, b = p, x, v
+    elif sector == 4:
+        r, g, b = x, p, v
+    else:
+        r, g, b = v, p, x
+    buf[offset + order[0]] = r
+    buf[offset + order[1]] = g
+    buf[offset + order[2]] = b
@@ -0,0 +1,181 @@
+# kvlog.py Append-only key-value store with an in-RAM index.
+#
+# Every put() or delete() appends one record to the log file; nothing is
+# rewritten in place. The index maps each key to the offset and length of its
+# newest value, so get() is one dict lookup plus one seek and read. Records
+# superseded by later ones are garbage; once garbage outweighs the live data
+# the log is compacted by writing the live records to a temp file and
+# renaming it over the log.
+#
+# Record: marker 0xA5, key length (u8), value length (u16, DELETED for a
+#         tombstone), CRC32 of key and value (u32), key (UTF-8), value.
+# A record that does not check out ends the log: it is a write cut short by a
+# reset, and the next compaction drops it.
+#
+# If the log cannot be opened the store stays empty and closed: get() returns
+# the default and put() or delete() raise OSError like a failed write would.
+
+import os
+import struct
+from binascii import crc32
+
+MARKER = 0xA5
+HEAD = "<BBHI"
+HEAD_SIZE = 8
+DELETED = 0xFFFF
+MAX_VALUE = 0xFFFE
+
+
+class KVLog:
+    def __init__(self, path, compact_min=1024):
+        self.path = path
+        self.compact_min = compact_min  # bytes of garbage tolerated anyway
+        self.index = {}                 # key -> (value offset, value length)
+        self.end = 0                    # end of the valid log
+        self.live = 0                   # bytes of records in the index
+        self.compactions = 0
+        self.appends = 0
+        self._head = bytearray(HEAD_SIZE)
+        self.f = None
+
+    def open(self):
+        """Open the log, creating it if needed, and build the index."""
+        try:
+            try:
+                self.f = open(self.path, "r+b")
+            except OSError:
+                self.f = open(self.path, "w+b")
+            self._scan()
+            if self.f.seek(0, 2) != self.end:
+                self.compact()  # drop a torn last record
+        except OSError:
+            self.close()
+            self.index.clear()
+            self.end = self.live = 0
+            raise
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+    def _scan(self):
+        f, head, index = self.f, self._head, self.index
+        index.clear()
+        self.live = 0
+        pos = 0
+        f.seek(0)
+        while f.readinto(head) == HEAD_SIZE:
+            marker, klen, vlen, crc = struct.unpack(HEAD, head)
+            size = klen + (0 if vlen == DELETED else vlen)
+            data = f.read(size)
+            if marker != MARKER or len(data) != size or crc32(data) != crc:
+                break
+            try:
+                key = data[:klen].decode()
+            except UnicodeError:
+                break
+            old = index.pop(key, None)
+            if old:
+                self.live -= HEAD_SIZE + klen + old[1]  # same key, same byte length
+            if vlen != DELETED:
+                index[key] = (pos + HEAD_SIZE + klen, vlen)
+                self.live += HEAD_SIZE + size
+            pos += HEAD_SIZE + size
+        self.end = pos
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def get(self, key, default=None):
+        """Newest value of key as bytes, or default."""
+        loc = self.index.get(key)
+        if loc is None:
+            return default
+        self.f.seek(loc[0])
+        return self.f.read(loc[1])
+
+    def get_int(self, key, default=0):
+        v = self.get(key)
+        return struct.unpack("<i", v)[0] if v and len(v) == 4 else default
+
+    def put_int(self, key, value):
+        self.put(key, struct.pack("<i", value))
+
+    def _append(self, key, kb, value):
+        vlen = DELETED if value is None else len(value)
+        data = kb + value if value is not None else kb
+        f = self.f
+        if f is None:
+            raise OSError("{} not open".format(self.path))
+        f.seek(self.end)
+        f.write(struct.pack(HEAD, MARKER, len(kb), vlen, crc32(data)))
+        f.write(data)
+        f.flush()
+        pos = self.end
+        self.end += HEAD_SIZE + len(data)
+        self.appends += 1
+        return pos
+
+    def put(self, key, value):
+        """Store value (bytes or str) under key; unchanged values are not written."""
+        if isinstance(value, str):
+            value = value.encode()
+        if len(value) > MAX_VALUE:
+            raise ValueError("value too large")
+        old = self.index.get(key)
+        if old and old[1] == len(value) and self.get(key) == value:
+            return
+        kb = key.encode()
+        pos = self._append(key, kb, value)
+        if old:
+            self.live -= HEAD_SIZE + len(kb) + old[1]
+        self.index[key] = (pos + HEAD_SIZE + len(kb), len(value))
+        self.live += HEAD_SIZE + len(kb) + len(value)
+        self._maybe_compact()
+
+    def delete(self, key):
+        old = self.index.pop(key, None)
+        if old is None:
+            return
+        kb = key.encode()
+        self._append(key, kb, None)
+        self.live -= HEAD_SIZE + len(kb) + old[1]
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        garbage = self.end - self.live
+        if garbage > self.compact_min and garbage > self.live:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with only the live records."""
+        tmp = self.path + ".tmp"
+        index = {}
+        pos = 0
+        with open(tmp, "wb") as out:
+            for key in self.index:
+                kb = key.encode()
+                data = kb + self.get(key)
+                out.write(struct.pack(HEAD, MARKER, len(kb), len(data) - len(kb), crc32(data)))
+                out.write(data)
+                index[key] = (pos + HEAD_SIZE + len(kb), len(data) - len(kb))
+                pos += HEAD_SIZE + len(data)
+        self.f.close()
+        try:
+            os.rename(tmp, self.path)
+        finally:
+            self.f = open(self.path, "r+b")  # the old log if the rename failed
+        self.index = index
+        self.end = self.live = pos
+        self.compactions += 1
+
+    def lines(self, name):
+        return ["{} keys{} {}/{}B".format(name, len(self.index), self.live, self.end),
+                "{} appends{} compact{}".format(name, self.appends, self.compactions)]
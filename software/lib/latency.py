@@ -0,0 +1,141 @@
+# latency.py Optional end-to-end input latency tracing.
+#
+# One input (or batch of inputs handled together) is traced through these
+# stamps, all in ticks_us():
+#   IRQ     pin edge seen by the IRQ handler
+#   SCHED   scheduled callback ran
+#   HIN     ui_task starts handle_button()
+#   HOUT    handle_button() returned
+#   DRAW    drawing finished, first flush to the display starts
+#   FLUSH   render() returned, pixels are on the panel
+# Totals (IRQ -> FLUSH) are collected in a histogram per screen type.
+
+from array import array
+import time
+
+IRQ = 0
+SCHED = 1
+HIN = 2
+HOUT = 3
+DRAW = 4
+FLUSH = 5
+
+STAGE_NAMES = ("irq>sched", "sched>hin", "handle", "draw", "flush")
+BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500)  # upper bounds; one overflow bucket
+
+
+class LatencyTracer:
+    def __init__(self, target_ms=50):
+        self.target_ms = target_ms  # responsiveness target, used in reports
+        self._t = array("L", [0] * 6)
+        self._active = False
+        self._pending = False
+        self._p_irq = 0
+        self._p_sched = 0
+        self.stage_sum = array("L", [0] * len(STAGE_NAMES))
+        self.stage_max = array("L", [0] * len(STAGE_NAMES))
+        self.count = 0
+        self.hist = {}  # screen name -> [n, sum_us, max_us, over_target, buckets...]
+
+    def arrive(self, irq_ts):
+        """Called from the scheduled callback for an input that will be
+        delivered to a screen. Only the oldest input of a batch is traced."""
+        if not self._pending:
+            self._p_irq = irq_ts
+            self._p_sched = time.ticks_us()
+            self._pending = True
+
+    def begin(self):
+        """ui_task starts handling the pending batch."""
+        if not self._pending:
+            return
+        self._pending = False
+        t = self._t
+        t[IRQ] = self._p_irq
+        t[SCHED] = self._p_sched
+        for i in range(HIN, FLUSH + 1):
+            t[i] = 0
+        t[HIN] = time.ticks_us()
+        self._active = True
+
+    def mark(self, stage):
+        if self._active:
+            self._t[stage] = time.ticks_us()
+
+    def mark_draw(self):
+        # only the first flush of a render counts as end of drawing
+        if self._active and not self._t[DRAW]:
+            self._t[DRAW] = time.ticks_us()
+
+    def end(self, screen_name):
+        """Close the trace; returns True if one was recorded."""
+        if not self._active:
+            return False
+        self._active = False
+        t = self._t
+        t[FLUSH] = time.ticks_us()
+        if not t[DRAW]:
+            t[DRAW] = t[FLUSH]
+        for i in range(len(STAGE_NAMES)):
+            d = max(0, time.ticks_diff(t[i + 1], t[i]))
+            self.stage_sum[i] += d
+            if d > self.stage_max[i]:
+                self.stage_max[i] = d
+        total = time.ticks_diff(t[FLUSH], t[IRQ])
+        self.count += 1
+
+        h = self.hist.get(screen_name)
+        if h is None:
+            h = [0, 0, 0, 0] + [0] * (len(BUCKETS_MS) + 1)
+            self.hist[screen_name] = h
+        h[0] += 1
+        h[1] += total
+        if total > h[2]:
+            h[2] = total
+        ms = total // 1000
+        if ms > self.target_ms:
+            h[3] += 1
+        b = 0
+        while b < len(BUCKETS_MS) and ms >= BUCKETS_MS[b]:
+            b += 1
+        h[4 + b] += 1
+        return True
+
+    def hook_display(self, display):
+        """Wrap display.show()/show_rect() to stamp the end of drawing."""
+        show = display.show
+        show_rect = display.show_rect
+
+        def traced_show():
+            self.mark_draw()
+            show()
+
+        def traced_show_rect(x, y, w, h):
+            self.mark_draw()
+            show_rect(x, y, w, h)
+
+        display.show = traced_show
+        display.show_rect = traced_show_rect
+
+    def lines(self):
+        """Short summary lines (avg/max), for serial and the diagnostics screen."""
+        out = ["Latency avg/max, target {}ms".format(self.target_ms)]
+        for name, h in sorted(self.hist.items()):
+            if name.endswith("Screen"):
+                name = name[:-6]
+            out.append("{} {}/{}ms n{} slow{}".format(
+                name, h[1] // h[0] // 1000, h[2] // 1000, h[0], h[3]))
+        if self.count:
+            for i, name in enumerate(STAGE_NAMES):
+                out.append("{} {}/{}us".format(
+                    name, self.stage_sum[i] // self.count, self.stage_max[i]))
+        return out
+
+    def report(self):
+        for line in self.lines():
+            print(line)
+        if not self.hist:
+            return
+        print("Histogram (ms):", " ".join("<{}".format(b) for b in BUCKETS_MS), ">={}".format(BUCKETS_MS[-1]))
+        for name, h in sorted(self.hist.items()):
+            print("  {}: {}".format(name, " ".join(str(n) for n in h[4:])))
@@ -0,0 +1,51 @@
+# ledout.py Output stage between LED effects and the NeoPixel strip.
+#
+# Effects render at full scale into a working frame with the strip's layout.
+# write() maps every byte through a 256-entry gamma + brightness table into
+# the strip's buffer and sends it, unless the result equals what the strip
+# already shows. Changing the brightness rebuilds the table once; there is
+# no per-pixel scaling in the effects.
+
+
+class LedOutput:
+    def __init__(self, np, gamma=2.2):
+        self.np = np
+        self.gamma = gamma
+        self.buf = bytearray(len(np.buf))  # the working frame effects draw into
+        self.bpp = np.bpp
+        self.ORDER = np.ORDER
+        self.lut = bytearray(256)
+        self.level = -1  # brightness the table is built for, 0..255
+        self.rebuilds = 0
+        self.written = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.np)
+
+    def set_level(self, level):
+        """Rebuild the table for a new brightness; returns True if it did."""
+        if level == self.level:
+            return False
+        lut, g = self.lut, self.gamma
+        for i in range(256):
+            lut[i] = int(level * (i / 255) ** g + 0.5)
+        self.level = level
+        self.rebuilds += 1
+        return True
+
+    def write(self):
+        """Send the frame if it differs from the last one; True if sent."""
+        src, dst, lut = self.buf, self.np.buf, self.lut
+        changed = False
+        for i in range(len(src)):
+            v = lut[src[i]]
+            if dst[i] != v:
+                dst[i] = v
+                changed = True
+        if not changed:
+            self.skipped += 1
+            return False
+        self.np.write()
+        self.written += 1
+        return True
@@ -0,0 +1,68 @@
+# pacer.py Deadline-based frame pacing for periodic tasks.
+#
+# Frames are due at absolute times (ticks_ms) one period apart, so the time
+# spent rendering does not add up into drift. A task that falls behind by
+# whole periods skips those frames instead of trying to catch up. Achieved
+# frame rate, late frames and the worst wake-up jitter are recorded.
+
+import time
+import uasyncio as asyncio
+
+
+class FramePacer:
+    def __init__(self, fps):
+        self.period = 1000 // fps
+        self.fps = fps          # target
+        self.frames = 0
+        self.late = 0           # frames that started after their deadline
+        self.skipped = 0        # frames dropped to catch up
+        self.jitter_max = 0     # ms, worst wake-up after a deadline
+        self.achieved = 0       # frames per second over the last window
+        self.resync()
+
+    def set_fps(self, fps):
+        if fps != self.fps:
+            self.fps = fps
+            self.period = 1000 // fps
+
+    def resync(self):
+        """Restart the schedule from now, e.g. after the task was suspended."""
+        now = time.ticks_ms()
+        self.deadline = now
+        self._win_start = now
+        self._win_frames = 0
+
+    async def wait(self):
+        """Sleep until the next frame is due."""
+        period = self.period
+        self.deadline = time.ticks_add(self.deadline, period)
+        behind = time.ticks_diff(time.ticks_ms(), self.deadline)
+        if behind < 0:
+            await asyncio.sleep_ms(-behind)
+        else:
+            if behind >= period:
+                missed = behind // period
+                self.skipped += missed
+                self.deadline = time.ticks_add(self.deadline, missed * period)
+            if behind:
+                self.late += 1
+            await asyncio.sleep_ms(0)  # still let other tasks run
+
+        now = time.ticks_ms()
+        jitter = time.ticks_diff(now, self.deadline)
+        if jitter > self.jitter_max:
+            self.jitter_max = jitter
+        self.frames += 1
+        self._win_frames += 1
+        elapsed = time.ticks_diff(now, self._win_start)
+        if elapsed >= 1000:
+            self.achieved = self._win_frames * 1000 // elapsed
+            self._win_start = now
+            self._win_frames = 0
+
+    def reset_stats(self):
+        self.frames = self.late = self.skipped = self.jitter_max = 0
+
+    def lines(self, name):
+        return ["{} fps {}/{} late{} skip{}".format(name, self.achieved, self.fps, self.late, self.skipped),
+                "{} jitter max {}ms".format(name, self.jitter_max)]
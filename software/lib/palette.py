@@ -0,0 +1,41 @@
+# palette.py Precomputed colour wheel for LED effects.
+#
+# Holds all 360 hues at the current saturation and value, already in the
+# strip's byte order. The wheel is rebuilt only when saturation or value
+# change; effects just copy entries into the pixel buffer.
+
+from hsv import hsv_into
+
+
+class Palette:
+    def __init__(self, order):
+        self.order = order
+        self.wheel = bytearray(360 * 3)
+        self.sat = -1   # wheel is built for this saturation/value (0..255)
+        self.val = -1
+        self.rebuilds = 0
+
+    def update(self, sat, val):
+        """Rebuild the wheel if sat/val changed; returns True if it did."""
+        if sat == self.sat and val == self.val:
+            return False
+        wheel, order = self.wheel, self.order
+        for h in range(360):
+            hsv_into(wheel, h * 3, h, sat, val, order)
+        self.sat = sat
+        self.val = val
+        self.rebuilds += 1
+        return True
+
+    def colour_into(self, buf, offset, h, level=255):
+        """Copy hue h into buf[offset:offset+3], scaled by level/255."""
+        w = self.wheel
+        i = (h % 360) * 3
+        if level >= 255:
+            buf[offset] = w[i]
+            buf[offset + 1] = w[i + 1]
+            buf[offset + 2] = w[i + 2]
+        else:
+            buf[offset] = w[i] * level // 255
+            buf[offset + 1] = w[i + 1] * level // 255
+            buf[offset + 2] = w[i + 2] * level // 255
@@ -0,0 +1,94 @@
+# recstore.py One small binary record kept in two alternating slots.
+#
+# The file holds two fixed-size slots. Each save goes to the slot not holding
+# the current record, with a higher sequence number and a CRC, so a reset in
+# the middle of a write leaves the previous record intact. load() reads the
+# whole file with one readinto() and returns the newest slot that checks out.
+#
+# Slot: magic "BR", format version, 0, payload length (u16), sequence (u32),
+#       payload (padded to max_payload), CRC32 of everything before it.
+
+import struct
+from binascii import crc32
+
+MAGIC = b"BR"
+HEAD = "<2sBxHI"
+HEAD_SIZE = 10
+
+
+class RecordStore:
+    def __init__(self, path, max_payload):
+        self.path = path
+        self.max_payload = max_payload
+        self.slot_size = HEAD_SIZE + max_payload + 4
+        self.buf = bytearray(2 * self.slot_size)
+        self.slot = -1  # slot of the current record, -1 if none
+        self.seq = 0
+        self.saves = 0
+        self.errors = 0  # slots found damaged on load
+        self.size = 0    # file size seen on load; short until both slots exist
+
+    def _check(self, slot, size):
+        # returns (version, length, seq) of a valid slot, else None;
+        # size is how much of the file was read
+        off = slot * self.slot_size
+        if off + self.slot_size > size:
+            return None
+        magic, version, length, seq = struct.unpack_from(HEAD, self.buf, off)
+        if magic != MAGIC or length > self.max_payload:
+            return None
+        end = off + HEAD_SIZE + self.max_payload
+        crc = struct.unpack_from("<I", self.buf, end)[0]
+        if crc32(memoryview(self.buf)[off:end]) != crc:
+            self.errors += 1
+            return None
+        return version, length, seq
+
+    def load(self):
+        """Returns (version, payload memoryview) of the newest record, or None."""
+        self.size = 0
+        try:
+            with open(self.path, "rb") as f:
+                self.size = f.readinto(self.buf) or 0
+        except OSError:
+            return None
+        # a file cut short while it was first written may still hold slot 0
+        best = None
+        for slot in (0, 1):
+            r = self._check(slot, self.size)
+            if r and (best is None or r[2] > best[2]):
+                best = (r[0], r[1], r[2], slot)
+        if best is None:
+            return None
+        version, length, self.seq, self.slot = best
+        off = self.slot * self.slot_size + HEAD_SIZE
+        return version, memoryview(self.buf)[off:off + length]
+
+    def save(self, version, payload):
+        """Write payload (bytes, at most max_payload) as the new record."""
+        if len(payload) > self.max_payload:
+            raise ValueError("record too large")
+        slot = 1 - self.slot if self.slot >= 0 else 0
+        off = slot * self.slot_size
+        end = off + HEAD_SIZE + self.max_payload
+        buf = self.buf
+        struct.pack_into(HEAD, buf, off, MAGIC, version, len(payload), self.seq + 1)
+        buf[off + HEAD_SIZE:off + HEAD_SIZE + len(payload)] = payload
+        for i in range(off + HEAD_SIZE + len(payload), end):
+            buf[i] = 0
+        struct.pack_into("<I", buf, end, crc32(memoryview(buf)[off:end]))
+        if self.size and off <= self.size:
+            # in place; a file cut short during its first write grows back
+            # to both slots without touching the record it still holds
+            with open(self.path, "r+b") as f:
+                f.seek(off)
+                f.write(memoryview(buf)[off:off + self.slot_size])
+            self.size = max(self.size, off + self.slot_size)
+        else:
+            # no file yet: create it with both slots
+            with open(self.path, "wb") as f:
+                f.write(buf)
+            self.size = len(buf)
+        self.slot = slot
+        self.seq += 1
+        self.saves += 1
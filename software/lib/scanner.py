@@ -0,0 +1,70 @@
+# scanner.py Polled button scanner, an alternative to per-pin IRQs.
+#
+# One long-lived task calls scan() every few ms. Each button runs a small
+# debounce state machine kept in preallocated arrays and generates press,
+# release, repeat and long-press events through a push callback. Nothing is
+# allocated per scan or per press.
+
+from array import array
+import time
+from events import EDGE_PRESS, EDGE_RELEASE, EDGE_REPEAT, EDGE_LONG
+
+
+class ButtonScanner:
+    def __init__(self, pins, ids, push, scan_ms=5, debounce_ms=20,
+                 repeat_ids=(), repeat_delay=500, repeat_interval=50,
+                 repeat_step=None, long_ids=(), long_ms=800):
+        """pins: active-low Pin objects; ids: button id per pin;
+        push(btn, edge, ts_us, count) receives the events;
+        repeat_step(held_ms) gives the step count of a repeat event;
+        buttons in long_ids report a long press after long_ms held."""
+        n = len(pins)
+        self.pins = pins
+        self.ids = bytearray(ids)
+        self.push = push
+        self.scan_ms = scan_ms
+        self.samples = max(1, (debounce_ms + scan_ms - 1) // scan_ms)
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.repeat_step = repeat_step or (lambda held: 1)
+        self.long_ms = long_ms
+
+        self._repeat = bytearray(1 if i in repeat_ids else 0 for i in ids)
+        self._longable = bytearray(1 if i in long_ids else 0 for i in ids)
+        self._stable = bytearray(n)    # debounced state, 1 = pressed
+        self._diff = bytearray(n)      # consecutive samples differing from _stable
+        self._long = bytearray(n)      # long press already reported
+        self._t_press = array("L", [0] * n)  # ticks_ms of the press
+        self._t_next = array("L", [0] * n)   # ticks_ms of the next repeat
+
+    def scan(self, now):
+        for i in range(len(self.pins)):
+            raw = 0 if self.pins[i].value() else 1
+            if raw != self._stable[i]:
+                self._diff[i] += 1
+                if self._diff[i] >= self.samples:
+                    self._diff[i] = 0
+                    self._stable[i] = raw
+                    if raw:
+                        self._t_press[i] = now
+                        self._t_next[i] = time.ticks_add(now, self.repeat_delay)
+                        self._long[i] = 0
+                        self.push(self.ids[i], EDGE_PRESS, time.ticks_us(), 1)
+                    else:
+                        self.push(self.ids[i], EDGE_RELEASE, time.ticks_us(), 1)
+                continue
+            self._diff[i] = 0
+            if not raw:
+                continue
+
+            # held: auto-repeat or long press
+            if self._repeat[i]:
+                if time.ticks_diff(now, self._t_next[i]) >= 0:
+                    held = time.ticks_diff(now, self._t_press[i]) - self.repeat_delay
+                    # re-arm from now so a stalled scan never bursts repeats
+                    self._t_next[i] = time.ticks_add(now, self.repeat_interval)
+                    self.push(self.ids[i], EDGE_REPEAT, time.ticks_us(), self.repeat_step(held))
+            elif self._longable[i] and not self._long[i] and \
+                    time.ticks_diff(now, self._t_press[i]) >= self.long_ms:
+                self._long[i] = 1
+                self.push(self.ids[i], EDGE_LONG, time.ticks_us(), 1)
@@ -0,0 +1,131 @@
+# sequence.py Streamed playback of precomputed LED animations.
+#
+# A sequence file holds RGB keyframes rendered on a host (see
+# tools/make_sequence.py). The player keeps the file open while selected and
+# reads one frame at a time with readinto() into buffers allocated when the
+# sequence is selected, so any length plays in constant memory.
+#
+# File layout, little endian:
+#   header  "LEDS", version (1), flags, pixels, 0, frame_ms (u16), frames (u16)
+#   frames  raw: pixels * RGB
+#           delta (flags bit 0): count byte, then count * (index, R, G, B);
+#           count 255 means a raw frame follows. Frame 0 is always raw.
+#
+# A frame that does not fit the header (a count or pixel index out of range,
+# or the file ending early) stops playback; the effect then shows black.
+
+import os
+import struct
+import effects
+from effects import Effect
+
+MAGIC = b"LEDS"
+VERSION = 1
+FLAG_DELTA = 1
+HEADER = "<4sBBBBHH"
+HEADER_SIZE = 12
+FULL_FRAME = 255
+EXT = ".led"
+
+
+class SequencePlayer(Effect):
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.f = None
+        self.pixels = 0
+        self.rgb = None
+
+    def reset(self):
+        self.stop()
+        self.t = 0
+        try:
+            f = open(self.path, "rb")
+            magic, version, flags, pixels, _, frame_ms, frames = struct.unpack(HEADER, f.read(HEADER_SIZE))
+            if magic != MAGIC or version != VERSION or not pixels or not frames or not frame_ms:
+                raise ValueError("bad header")
+        except (OSError, ValueError) as e:
+            print("Sequence {}: {}".format(self.path, e))
+            return
+        self.f = f
+        self.delta = flags & FLAG_DELTA
+        self.frame_ms = frame_ms
+        self.frames = frames
+        if pixels != self.pixels:
+            self.pixels = pixels
+            self.rgb = bytearray(pixels * 3)
+            self._count = bytearray(1)
+            changes = bytearray(pixels * 4)
+            # one view per possible change count, so reads never slice
+            self._changes = changes
+            self._views = [memoryview(changes)[:k * 4] for k in range(pixels + 1)]
+        self.index = 0
+        if not self._read_frame():
+            self._damaged()
+
+    def stop(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+    def _damaged(self):
+        print("Sequence {}: bad frame {}".format(self.path, self.index))
+        self.stop()
+
+    def _read_frame(self):
+        # False if the frame is damaged or cut short
+        f = self.f
+        if self.index == self.frames:
+            f.seek(HEADER_SIZE)
+            self.index = 0
+        if self.delta:
+            if f.readinto(self._count) != 1:
+                return False
+            count = self._count[0]
+        else:
+            count = FULL_FRAME
+        if count == FULL_FRAME:
+            if f.readinto(self.rgb) != len(self.rgb):
+                return False
+        elif count:
+            if count > self.pixels or f.readinto(self._views[count]) != count * 4:
+                return False
+            rgb, ch, pixels = self.rgb, self._changes, self.pixels
+            for o in range(0, count * 4, 4):
+                if ch[o] >= pixels:
+                    return False
+                p = ch[o] * 3
+                rgb[p] = ch[o + 1]
+                rgb[p + 1] = ch[o + 2]
+                rgb[p + 2] = ch[o + 3]
+        self.index += 1
+        return True
+
+    def render(self, buf, n, bpp, pal, hue, speed, dt):
+        if not self.f:
+            effects.clear(buf)
+            return
+        # keep the sequence's own frame rate whatever the LED rate is
+        self.t += dt
+        while self.t >= self.frame_ms:
+            self.t -= self.frame_ms
+            if not self._read_frame():
+                self._damaged()
+                effects.clear(buf)
+                return
+        rgb, order = self.rgb, pal.order
+        for i in range(min(n, self.pixels)):
+            o, p = i * bpp, i * 3
+            buf[o + order[0]] = rgb[p]
+            buf[o + order[1]] = rgb[p + 1]
+            buf[o + order[2]] = rgb[p + 2]
+
+
+def register_dir(folder):
+    """Add a player for every sequence file in folder to the effect registry."""
+    try:
+        names = sorted(f for f in os.listdir(folder) if f.endswith(EXT))
+    except OSError:
+        return
+    for f in names:
+        effects.registry.append(SequencePlayer(folder + "/" + f, f[:-len(EXT)]))
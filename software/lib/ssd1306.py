@@ -109,6 +109,31 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(self.pages - 1)
         self.write_data(self.buffer)
 
+    def show_rect(self, x, y, w, h):
+        # flush only the columns/pages covering the given pixel rectangle
+        x0 = max(0, x)
+        x1 = min(self.width, x + w) - 1
+        p0 = max(0, y) // 8
+        p1 = (min(self.height, y + h) - 1) // 8
+        if x1 < x0 or p1 < p0:
+            return
+        col_offset = (128 - self.width) // 2 if self.width != 128 else 0
+        self.write_cmd(SET_COL_ADDR)
+        self.write_cmd(x0 + col_offset)
+        self.write_cmd(x1 + col_offset)
+        self.write_cmd(SET_PAGE_ADDR)
+        self.write_cmd(p0)
+        self.write_cmd(p1)
+        # the column pointer wraps inside the window, so pages can be sent
+        # one after another straight from the framebuffer
+        mv = memoryview(self.buffer)
+        if x0 == 0 and x1 == self.width - 1:
+            self.write_data(mv[p0 * self.width : (p1 + 1) * self.width])
+        else:
+            for page in range(p0, p1 + 1):
+                base = page * self.width
+                self.write_data(mv[base + x0 : base + x1 + 1])
+
 
 class SSD1306_I2C(SSD1306):
     def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
@@ -0,0 +1,203 @@
+# widgets.py Lightweight retained-mode widgets for the SSD1306 framebuffer.
+#
+# Every widget owns a fixed rectangle. Changing its content marks it dirty;
+# the owning screen repaints only dirty widgets and flushes only their
+# rectangles to the panel (see WidgetScreen in bsides25.py).
+
+ALIGN_LEFT = 0
+ALIGN_CENTER = 1
+ALIGN_RIGHT = 2
+
+
+def ellipsize(writer, text, w):
+    """text cut to at most w pixels, ending in "..." if it was cut."""
+    if writer.stringlen(text) <= w:
+        return text
+    while text and writer.stringlen(text + "...") > w:
+        text = text[:-1]
+    return text + "..."
+
+
+def fit_text(writer, text, w, rows):
+    """Lines of text word-wrapped to w pixels, at most rows of them; what
+    does not fit is cut off with "...". The Writer would wrap at the screen
+    edge and scroll the whole display instead."""
+    if "\n" not in text and writer.stringlen(text) <= w:
+        return (text,)
+    lines = []
+    for para in text.split("\n"):
+        line = ""
+        for word in para.split(" "):
+            test = line + " " + word if line else word
+            if line and writer.stringlen(test) > w:
+                lines.append(line)
+                line = word
+            else:
+                line = test
+        lines.append(line)
+    if len(lines) > rows:
+        lines = lines[:rows]
+        lines[-1] += "..."
+    return [ellipsize(writer, line, w) for line in lines]
+
+
+class Widget:
+    def __init__(self, x, y, w, h):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.visible = True
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.dirty = True
+
+    def overlaps(self, other):
+        return (self.x < other.x + other.w and other.x < self.x + self.w and
+                self.y < other.y + other.h and other.y < self.y + self.h)
+
+    def clear(self, fb):
+        fb.fill_rect(self.x, self.y, self.w, self.h, 0)
+
+    def draw(self, fb):
+        pass
+
+
+class Label(Widget):
+    """Text in a given Writer; h defaults to one line of the font. Text is
+    wrapped into as many lines as h holds and cut off to stay inside."""
+    def __init__(self, writer, x, y, w, h=None, text="", align=ALIGN_LEFT):
+        super().__init__(x, y, w, h or writer.font.height())
+        self.writer = writer
+        self.text = text
+        self.align = align
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.dirty = True
+
+    def draw(self, fb):
+        if not self.text:
+            return
+        wri = self.writer
+        height = wri.font.height()
+        y = self.y
+        for line in fit_text(wri, self.text, self.w, max(1, self.h // height)):
+            x = self.x
+            if self.align != ALIGN_LEFT:
+                free = self.w - wri.stringlen(line)
+                x += free if self.align == ALIGN_RIGHT else free // 2
+            wri.set_textpos(fb, y, x)
+            wri.printstring(line)
+            y += height
+
+
+class Bar(Widget):
+    """Horizontal slider: knob line or filled bar for value in 0..maxval."""
+    def __init__(self, x, y, w, h, maxval, fill=False):
+        super().__init__(x, y, w, h)
+        self.maxval = maxval
+        self.fill = fill
+        self.value = 0
+
+    def set_value(self, value):
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def draw(self, fb):
+        fb.rect(self.x, self.y, self.w, self.h, 1)
+        pos = self.x + (self.value * (self.w - 1)) // self.maxval
+        if self.fill:
+            fb.fill_rect(self.x, self.y, pos - self.x, self.h, 1)
+        else:
+            fb.vline(pos, self.y, self.h, 1)
+
+
+class ListRow(Label):
+    """One list entry, prefixed with '>' when selected."""
+    def __init__(self, writer, x, y, w):
+        super().__init__(writer, x, y, w)
+        self.selected = False
+
+    def set(self, text, selected):
+        self.set_text(text)
+        if selected != self.selected:
+            self.selected = selected
+            self.dirty = True
+
+    def draw(self, fb):
+        if not self.text:
+            return
+        text = "{}{}".format(">" if self.selected else " ", self.text)
+        self.writer.set_textpos(fb, self.y, self.x)
+        self.writer.printstring(ellipsize(self.writer, text, self.w))
+
+
+class Bitmap(Widget):
+    """Blits a FrameBuffer (e.g. a logo module's fb) at its origin."""
+    def __init__(self, x, y, w, h, fb=None):
+        super().__init__(x, y, w, h)
+        self.fb = fb
+
+    def set_bitmap(self, fb):
+        if fb is not self.fb:
+            self.fb = fb
+            self.dirty = True
+
+    def draw(self, fb):
+        if self.fb is not None:
+            fb.blit(self.fb, self.x, self.y)
+
+
+class Box(Widget):
+    """Outline or solid rectangle; a 1 px high solid box is a rule line."""
+    def __init__(self, x, y, w, h, fill=False):
+        super().__init__(x, y, w, h)
+        self.fill = fill
+
+    def draw(self, fb):
+        if self.fill:
+            fb.fill_rect(self.x, self.y, self.w, self.h, 1)
+        else:
+            fb.rect(self.x, self.y, self.w, self.h, 1)
+
+
+def repaint(fb, widgets, full=False):
+    """Repaint dirty widgets (or all if full) and return the ones repainted.
+
+    Widgets overlapping a dirty one are repainted too, so clearing a rectangle
+    never leaves a neighbour half-erased. Widgets are drawn in list order.
+    """
+    if full:
+        fb.fill(0)
+        for w in widgets:
+            w.dirty = True
+    else:
+        changed = True
+        while changed:
+            changed = False
+            for w in widgets:
+                if w.dirty:
+                    continue
+                for d in widgets:
+                    if d.dirty and w.overlaps(d):
+                        w.dirty = True
+                        changed = True
+                        break
+    dirty = [w for w in widgets if w.dirty]
+    if not full:
+        for w in dirty:
+            w.clear(fb)
+    for w in dirty:
+        if w.visible:
+            w.draw(fb)
+        w.dirty = False
+    return dirty
@@ -0,0 +1,189 @@
+# wifimgr.py Shared WiFi connection, managed by one task.
+#
+# Network features call acquire(), await wait_connected() and release()
+# when done. The task brings the link up, retries failed attempts with
+# exponential backoff, reconnects when the link drops and switches the
+# radio off once nobody has used it for idle_ms.
+#
+# The access point (BSSID and channel) of the last good connection is
+# cached, across reboots too when a key-value store is given, so a
+# reconnect goes straight to it instead of scanning. Connection times are
+# recorded for diagnostics.
+
+import time
+import network
+import uasyncio as asyncio
+
+OFF = 0
+CONNECTING = 1
+CONNECTED = 2
+BACKOFF = 3
+STATE_NAMES = ("off", "connecting", "connected", "backoff")
+
+AP_KEY = "wifi/ap"  # store key: BSSID (6 bytes) + channel
+
+
+class WifiManager:
+    def __init__(self, ssid, password, store=None, idle_ms=60000, connect_ms=10000,
+                 backoff_ms=1000, backoff_max_ms=60000):
+        self.ssid = ssid
+        self.password = password
+        self.store = store
+        self.idle_ms = idle_ms
+        self.connect_ms = connect_ms
+        self.backoff_ms = backoff_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.wlan = network.WLAN(network.STA_IF)
+        self.state = OFF
+        self.connected = asyncio.Event()  # set while the link is up
+        self._wake = asyncio.Event()
+        self._backoff = backoff_ms
+        self.users = 0
+        self._idle_since = time.ticks_ms()
+        self.ap = store.get(AP_KEY) if store is not None else None
+        self.attempts = 0
+        self.failures = 0
+        self.drops = 0       # links lost while connected
+        self.last_ms = 0     # time of the last successful connect
+        self.fast_ms = 0     # last connect to the cached AP
+        self.scan_ms = 0     # last connect that had to scan first
+
+    def acquire(self):
+        """Ask for the link to be up until release()."""
+        self.users += 1
+        self._backoff = self.backoff_ms  # a new request retries soon
+        self._wake.set()
+
+    def release(self):
+        self.users -= 1
+        if not self.users:
+            self._idle_since = time.ticks_ms()
+        self._wake.set()
+
+    async def wait_connected(self, timeout_ms):
+        try:
+            await asyncio.wait_for(self.connected.wait(), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            raise RuntimeError("No WiFi ({})".format(STATE_NAMES[self.state]))
+
+    async def _sleep(self, ms):
+        # sleeps ms, or less if acquire() or release() is called
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+
+    def _scan(self):
+        # strongest AP with our SSID; the scan blocks for a second or two,
+        # which is only paid without a cached AP
+        ssid = self.ssid.encode()
+        best = None
+        for ap in self.wlan.scan():
+            if ap[0] == ssid and (best is None or ap[3] > best[3]):
+                best = ap
+        return bytes(best[1]) + bytes([best[2]]) if best else None
+
+    def _store_ap(self, ap):
+        # a failed write only loses the cache, never the manager task
+        if self.store is None:
+            return
+        try:
+            if ap:
+                self.store.put(AP_KEY, ap)
+            else:
+                self.store.delete(AP_KEY)
+        except OSError as e:
+            print("WiFi: caching the AP failed: {}".format(e))
+
+    def _forget_ap(self):
+        self.ap = None
+        self._store_ap(None)
+
+    async def _connect(self):
+        wlan = self.wlan
+        wlan.active(True)
+        t0 = time.ticks_ms()
+        fast = self.ap is not None
+        if not fast:
+            self.ap = self._scan()
+        try:
+            if self.ap:
+                try:
+                    wlan.config(channel=self.ap[6])
+                except (ValueError, OSError):
+                    pass  # the port cannot preset the channel, bssid still helps
+                wlan.connect(self.ssid, self.password, bssid=self.ap[:6])
+            else:
+                wlan.connect(self.ssid, self.password)
+        except OSError:
+            return False
+        while not wlan.isconnected():
+            if time.ticks_diff(time.ticks_ms(), t0) > self.connect_ms:
+                try:
+                    wlan.disconnect()
+                except OSError:
+                    pass
+                if fast:
+                    self._forget_ap()  # AP gone or moved; scan next time
+                return False
+            await asyncio.sleep_ms(100)
+        ms = time.ticks_diff(time.ticks_ms(), t0)
+        self.last_ms = ms
+        print("WiFi up in {} ms{}".format(ms, "" if fast else " with scan"))
+        if fast:
+            self.fast_ms = ms
+        else:
+            self.scan_ms = ms
+            if self.ap:
+                self._store_ap(self.ap)
+        return True
+
+    def _radio_off(self):
+        self.connected.clear()
+        try:
+            self.wlan.disconnect()
+        except OSError:
+            pass
+        self.wlan.active(False)
+        self.state = OFF
+
+    async def run(self):
+        while True:
+            state = self.state
+            if state == OFF:
+                if self.users:
+                    self.state = CONNECTING
+                else:
+                    self._wake.clear()
+                    await self._wake.wait()
+            elif state == CONNECTING:
+                self.attempts += 1
+                if await self._connect():
+                    self._backoff = self.backoff_ms
+                    self.state = CONNECTED
+                    self.connected.set()
+                else:
+                    self.failures += 1
+                    self.state = BACKOFF
+            elif state == CONNECTED:
+                await self._sleep(1000)
+                if not self.wlan.isconnected():
+                    self.connected.clear()
+                    self.drops += 1
+                    self.state = CONNECTING
+                elif not self.users and time.ticks_diff(time.ticks_ms(), self._idle_since) >= self.idle_ms:
+                    self._radio_off()
+            else:  # BACKOFF
+                delay = self._backoff
+                self._backoff = min(delay * 2, self.backoff_max_ms)
+                await self._sleep(delay)
+                if self.users:
+                    self.state = CONNECTING
+                else:
+                    self._radio_off()
+
+    def lines(self, name):
+        return ["{} {} try{} fail{} drop{}".format(name, STATE_NAMES[self.state], self.attempts,
+                                                  self.failures, self.drops),
+                "{} ms last{} fast{} scan{}".format(name, self.last_ms, self.fast_ms, self.scan_ms)]
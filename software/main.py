@@ -1,7 +1,12 @@
 import machine, time
 
-time.sleep(0.1)
+t0 = time.ticks_ms()
+import splash  # logo on screen first
+
+# let the inputs settle (~100 ms) before sampling SELECT
+time.sleep_ms(max(0, 100 - time.ticks_diff(time.ticks_ms(), t0)))
 if machine.Pin(4, machine.Pin.IN).value() == 0:
     print("Not starting main application")
 else:
-    import bsides25
\ No newline at end of file
+    import bsides25
+    bsides25.run()
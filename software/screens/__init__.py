@@ -0,0 +1,3 @@
+# Screens other than the main menu. Each module is imported the first time
+# one of its screens is opened (see open_screen() in bsides25), which only
+# happens once the app is initialised, so modules can import from bsides25.
@@ -0,0 +1,36 @@
+# Badge setup menu
+from bsides25 import (Screen, ListScreen, MenuScreen, open_screen,
+                      wri6, wri10, BTN_SELECT, BTN_BACK)
+
+class CodeRepoScreen(Screen):
+    async def handle_button(self, btn, count=1):
+        if btn in (BTN_SELECT, BTN_BACK):
+            return open_screen("badge.BadgeScreen", self.oled)
+        return self
+
+    def render(self):
+        self.oled.fill(0)
+
+        wri10.set_textpos(self.oled, 0, 0)
+        wri10.printstring("Badge code git")
+
+        y = wri10.font.height() + 4
+        wri6.set_textpos(self.oled, y, 0)
+        wri6.printstring("github.com/ks000/ bsides_badge")
+
+        self.oled.show()
+
+badge_screens = [("Fetch Name", "fetch.FetchNameScreen"),
+                 ("Code git", "badge.CodeRepoScreen"),
+                 ("Diagnostics", "diag.DiagnosticsScreen")]
+
+class BadgeScreen(ListScreen):
+    def __init__(self, oled):
+        super().__init__(oled, "Badge setup", badge_screens)
+
+    def on_select(self, index):
+        return open_screen(badge_screens[index][1], self.oled)
+
+    def on_back(self):
+        return open_screen(MenuScreen, self.oled)
+
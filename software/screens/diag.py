@@ -0,0 +1,28 @@
+# Diagnostics: live counters from the subsystems registered in diag_sources
+import bsides25 as app
+from bsides25 import open_screen, diag_text, wri6, BTN_SELECT, BTN_BACK
+from screens.text import TextScreen
+
+class DiagnosticsScreen(TextScreen):
+    """Live counters; SELECT refreshes and dumps the report over serial."""
+    def __init__(self, oled):
+        super().__init__(oled, wri6, diag_text())
+
+    def refresh(self):
+        self.text = self._wrap_text(diag_text())
+        self.offset = min(self.offset, max(0, len(self.text) - self.rows))
+
+    def on_enter(self):
+        self.refresh()
+
+    async def handle_button(self, btn, count=1):
+        if btn == BTN_SELECT:
+            self.refresh()
+            print(diag_text())
+            if app.tracer:
+                app.tracer.report()
+            return self
+        if btn == BTN_BACK:
+            return open_screen("badge.BadgeScreen", self.oled)
+        return await super().handle_button(btn, count)
+
@@ -0,0 +1,101 @@
+# Fetch the badge owner's name from the badge server over WiFi.
+# Networking modules are only imported with this screen. The fetch runs as a
+# background task so input, display and LEDs keep going; BACK cancels it.
+# The WiFi link is shared and switched off by the manager once idle.
+import uasyncio as asyncio
+import ahttp
+import bsides25 as app
+from bsides25 import (WidgetScreen, open_screen, wri6, URL, URL_QR, WIFI_CONNECT_MS,
+                      BTN_SELECT, BTN_BACK)
+from widgets import Label
+
+BODY_MAX = 512  # the server answers with a short JSON object
+
+class FetchNameScreen(WidgetScreen):
+    def __init__(self, oled):
+        super().__init__(oled)
+        self.oled = oled
+        self.index = 0  # only one item
+        self.message = ""  # status message to display
+        self._task = None   # running fetch
+        self._body = bytearray(BODY_MAX)
+
+        # header = app.device_id; the status message shares the menu area and
+        # may wrap over several lines
+        line_y = wri6.font.height() + 2
+        self.add(Label(wri6, 0, 0, oled.width, text="ID: {}".format(app.device_id)))
+        self.url_label = self.add(Label(wri6, 0, line_y, oled.width, text=URL_QR))
+        self.menu_label = self.add(Label(wri6, 0, 2 * line_y, oled.width, text=">Fetch name"))
+        self.msg_label = self.add(Label(wri6, 0, line_y, oled.width, oled.height - line_y))
+
+    async def handle_button(self, btn, count=1):
+        if btn == BTN_SELECT:
+            if not self._task:
+                self._task = asyncio.create_task(self._fetch())
+        elif btn == BTN_BACK:
+            if self._task:
+                self._task.cancel()
+                self._task = None
+            return open_screen("badge.BadgeScreen", self.oled)
+
+        return self
+
+    def _progress(self, message):
+        self.message = message
+        if app.screen is self:
+            self.render()
+
+    async def _fetch(self):
+        wifi = app.get_wifi()
+        wifi.acquire()
+        try:
+            self._progress("Connecting WiFi...")
+            try:
+                # one failed attempt and its backoff fit in the wait
+                await wifi.wait_connected(2 * WIFI_CONNECT_MS)
+            except Exception as e:
+                self._progress(f"WiFi error: {e}")
+                return
+            try:
+                name = await self._fetch_name()
+                self._progress(f"Name: {name}")
+                app.led_flash(120)  # green: got it
+                app.set_username(name)  # saved with the settings
+            except Exception as e:
+                self._progress(f"Fetch error: {e}")
+        finally:
+            wifi.release()
+            if self._task is asyncio.current_task():
+                self._task = None  # not if BACK already dropped it for a new fetch
+
+    async def _fetch_name(self):
+        url = URL.rstrip("/") + "/getname/" + app.device_id
+        status, body = await ahttp.get(url, self._body, self._progress)
+        if status != 200:
+            raise RuntimeError("HTTP {}".format(status))
+        try:
+            data = ahttp.load_json(body)
+        except ValueError:
+            raise RuntimeError("Invalid JSON")
+
+        # Check for error
+        if "error" in data:
+            raise RuntimeError("{}".format(data.get("error","")))
+
+        # compare IDs case-insensitively
+        if data.get("id", "").upper() != app.device_id.upper() or "name" not in data:
+            raise RuntimeError("Unexpected response")
+
+        return data["name"].strip()
+
+    def on_enter(self):
+        # last fetch result is stale once the screen was left
+        self.message = ""
+
+    def update(self):
+        show_msg = bool(self.message)
+        self.msg_label.set_text(self.message)
+        self.msg_label.set_visible(show_msg)
+        self.url_label.set_visible(not show_msg)
+        self.menu_label.set_visible(not show_msg)
+
@@ -0,0 +1,85 @@
+# Lights menu: LED effect selection and parameter sliders
+from bsides25 import (WidgetScreen, ListScreen, MenuScreen, open_screen,
+                      led_effect, led_brightness, led_hue, led_sat, led_speed,
+                      wri10, BTN_NEXT, BTN_PREV, BTN_SELECT, BTN_BACK)
+from widgets import Label, Bar
+import effects
+
+class ParamScreen(WidgetScreen):
+    def __init__(self, oled, writer, param, returnscreen, barfill=False, wraparound=False):
+        super().__init__(oled)
+        self.writer = writer
+        self.param = param
+        self.returnscreen = returnscreen
+        self.barfill = barfill
+        self.wraparound = wraparound
+
+        self.bar = self.add(Bar(0, 30, oled.width, 10, param.maxval, fill=barfill))
+        # numeric display sits on the bottom line so the writer never scrolls
+        self.label = self.add(Label(writer, 0, oled.height - writer.font.height(), oled.width))
+
+    def update(self):
+        val = self.param.value
+        self.bar.set_value(val)
+        self.label.set_text("{}: {:3d}".format(self.param.name, val))
+
+    def _step(self, delta):
+        p = self.param
+        if self.wraparound:
+            p.value = (p.value + delta) % (p.maxval + 1)
+        else:
+            p.value = max(0, min(p.maxval, p.value + delta))
+
+    async def handle_button(self, btn, count=1):
+        if btn == BTN_NEXT:
+            self._step(count)
+        elif btn == BTN_PREV:
+            self._step(-count)
+        elif btn in (BTN_SELECT, BTN_BACK):
+            return open_screen(self.returnscreen, self.oled)
+        return self
+
+class BrightnessScreen(ParamScreen):
+    def __init__(self, oled):
+        super().__init__(oled, wri10, led_brightness, "lights.LightsScreen", barfill=True, wraparound=False)
+
+class SpeedScreen(ParamScreen):
+    def __init__(self, oled):
+        super().__init__(oled, wri10, led_speed, "lights.LightsScreen", barfill=True, wraparound=False)
+
+class SaturationScreen(ParamScreen):
+    def __init__(self, oled):
+        super().__init__(oled, wri10, led_sat, "lights.LightsScreen", barfill=False, wraparound=False)
+
+class HueScreen(ParamScreen):
+    def __init__(self, oled):
+        super().__init__(oled, wri10, led_hue, "lights.LightsScreen", barfill=False, wraparound=True)
+
+
+class EffectScreen(ListScreen):
+    def __init__(self, oled):
+        super().__init__(oled, "LED effects", [(e.name,) for e in effects.registry])
+
+    def on_select(self, index):
+        led_effect.value = index
+        return self
+
+    def on_back(self):
+        return open_screen("lights.LightsScreen", self.oled)
+
+lights_screens = [("Effects", "lights.EffectScreen"),
+                  ("Brightness", "lights.BrightnessScreen"),
+                  ("Hue", "lights.HueScreen"),
+                  ("Saturation", "lights.SaturationScreen"),
+                  ("Speed", "lights.SpeedScreen")]
+
+class LightsScreen(ListScreen):
+    def __init__(self, oled):
+        super().__init__(oled, "Lights", lights_screens)
+
+    def on_select(self, index):
+        return open_screen(lights_screens[index][1], self.oled)
+
+    def on_back(self):
+        return open_screen(MenuScreen, self.oled)
+
@@ -0,0 +1,55 @@
+# Sponsor logos
+import sys
+import os
+from bsides25 import Screen, MenuScreen, open_screen, BTN_NEXT, BTN_PREV, BTN_BACK
+
+logo_modules = []  # names of the imported logo modules
+
+def unload():
+    # called when this module is unloaded: the logo framebuffers are the
+    # largest data here and would otherwise stay in sys.modules
+    for name in logo_modules:
+        if name in sys.modules:
+            del sys.modules[name]
+    logo_modules.clear()
+
+class SponsorsScreen(Screen):
+    def __init__(self, oled):
+        super().__init__(oled)
+
+        # Import logos dynamically
+        LOGO_FOLDER = "logos"
+        if LOGO_FOLDER not in sys.path:
+            sys.path.append(LOGO_FOLDER)
+        # sources or precompiled .mpy (see tools/build_mpy.py)
+        logo_names = sorted(set(f.rsplit(".", 1)[0] for f in os.listdir(LOGO_FOLDER)
+                                if f.endswith(".py") or f.endswith(".mpy")))
+
+        self.logos = []
+        self.current_logo = 0
+        for module_name in logo_names:
+            mod = __import__(module_name)
+            if module_name not in logo_modules:
+                logo_modules.append(module_name)
+            if hasattr(mod, "fb"):
+                self.logos.append(mod.fb)
+            else:
+                print(f"Warning: {module_name} has no attribute 'fb'")
+
+        if not self.logos:
+            raise RuntimeError("No valid logos found!")
+
+    def render(self):
+        self.oled.fill(0)
+        self.oled.blit(self.logos[self.current_logo], 0, 0)
+        self.oled.show()
+
+    async def handle_button(self, btn, count=1):
+        if btn == BTN_NEXT:
+            self.current_logo = (self.current_logo + 1) % len(self.logos)
+        elif btn == BTN_PREV:
+            self.current_logo = (self.current_logo - 1) % len(self.logos)
+        if btn == BTN_BACK:
+            return open_screen(MenuScreen, self.oled)
+        return self
+
@@ -0,0 +1,72 @@
+# Scrollable text screens
+from bsides25 import Screen, MenuScreen, open_screen, wri6, BTN_NEXT, BTN_PREV, BTN_BACK
+
+class TextScreen(Screen):
+    def __init__(self, oled, writer, text):
+        super().__init__(oled)
+        self.wri = writer
+
+        # wrap long text
+        self.text = self._wrap_text(text)
+
+        # metrics
+        self.line_height = self.wri.font.height()
+        self.rows = oled.height // self.line_height
+        self.offset = 0
+
+    def _wrap_text(self, text):
+        lines = []
+        # split paragraphs by explicit newline
+        for para in text.split("\n"):
+            words = para.split()
+            line = ""
+            for word in words:
+                test_line = (line + " " + word).strip()
+                if self.wri.stringlen(test_line) <= self.oled.width:
+                    line = test_line
+                else:
+                    lines.append(line)
+                    line = word
+            if line:
+                lines.append(line)
+            if para == "":  # preserve blank lines
+                lines.append("")
+        return lines
+
+    def render(self):
+        self.oled.fill(0)
+        y = 0
+        for i in range(self.offset, min(len(self.text), self.offset + self.rows)):
+            self.wri.set_textpos(self.oled, y, 0)
+            self.wri.printstring(self.text[i])
+            y += self.line_height
+        self.oled.show()
+
+    async def handle_button(self, btn, count=1):
+        if btn == BTN_NEXT:
+            self.offset = max(0, min(len(self.text) - self.rows, self.offset + count))
+        elif btn == BTN_PREV:
+            self.offset = max(0, self.offset - count)
+        elif btn == BTN_BACK:
+            return open_screen(MenuScreen, self.oled)
+        return self
+
+class AboutScreen(TextScreen):
+    def __init__(self, oled):
+        text = (
+            "BSides is a worldwide infosec event format, organized by the local infosec community in every city it is held. BSides Tallinn is organized by a non-profit core-team, volunteers and sponsors since 2021.\n\n"
+            "One core difference of all BSides events is that the talks on the stage are proposed by anyone and selected by a program committee - professionals representing the organizers, private companies, academia, the state, freelancers.\n\n"
+            "Talks, presentations, demos, proof-of-concepts across a very broad spectrum of infosec topics. All of the content is proposed by community members."
+        )
+        super().__init__(oled, wri6, text)
+
+
+class OurteamScreen(TextScreen):
+    def __init__(self, oled):
+        text = (
+            "Organizers: Hans, Silvia, Matis, Liisa, Johanna, Martti, Rainer, Kadi\n\n"
+            "Badge: Konstantin\n\n"
+            "Volunteers: Elis, Elle, Kristo, Merli, Hanna, Liam, Sten"
+        )
+        super().__init__(oled, wri6, text)
+
@@ -0,0 +1,24 @@
+# Boot stage 1: bring up the display and show the logo before anything
+# heavy (fonts, networking, screens) is imported. bsides25 reuses oled.
+import bootlog
+bootlog.mark("main")
+
+from machine import Pin, I2C
+import ssd1306
+import bsides_logo
+
+I2C_SCL = 1
+I2C_SDA = 0
+OLED_WIDTH = 128
+OLED_HEIGHT = 64
+
+i2c_oled = I2C(0, scl=Pin(I2C_SCL), sda=Pin(I2C_SDA))
+oled = ssd1306.SSD1306_I2C(OLED_WIDTH, OLED_HEIGHT, i2c_oled)
+
+def show_bsides_logo(oled):
+    oled.fill(0)
+    oled.blit(bsides_logo.fb, 0, 0)
+    oled.show()
+
+show_bsides_logo(oled)
+bootlog.mark("splash")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Build a precompiled deploy bundle of software/.
+
+Every module is cross-compiled to .mpy bytecode, so the badge no longer
+compiles sources (fonts and logos included) on each boot. boot.py and
+main.py stay as sources: MicroPython only runs them as .py files. All
+other files are copied unchanged.
+
+    python tools/build_mpy.py [-o build/mpy] [--march rv32imc]
+    mpremote connect $PORT fs cp -r build/mpy/* :/ + run tools/drop_sources.py
+
+Needs mpy-cross matching the firmware's bytecode version
+(pip install mpy-cross==1.26.1 for MicroPython v1.26.1).
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, "software")
+KEEP_SOURCE = ("boot.py", "main.py")  # top-level files run by the firmware as .py
+SKIP_DIRS = ("__pycache__",)
+
+
+def mpy_cross_cmd():
+    exe = shutil.which("mpy-cross")
+    if exe:
+        return [exe]
+    try:
+        import mpy_cross  # noqa: F401  (pip package ships the binary)
+    except ImportError:
+        sys.exit("mpy-cross not found: pip install mpy-cross")
+    return [sys.executable, "-m", "mpy_cross"]
+
+
+def build(out, march=None):
+    cmd = mpy_cross_cmd()
+    if os.path.isdir(out):
+        shutil.rmtree(out)
+    compiled = copied = 0
+    src_bytes = mpy_bytes = 0
+    for dirpath, dirnames, filenames in os.walk(SOURCE):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        rel = os.path.relpath(dirpath, SOURCE)
+        dest_dir = os.path.normpath(os.path.join(out, rel))
+        os.makedirs(dest_dir, exist_ok=True)
+        for name in sorted(filenames):
+            src = os.path.join(dirpath, name)
+            top_level = rel == "."
+            if name.endswith(".py") and not (top_level and name in KEEP_SOURCE):
+                dest = os.path.join(dest_dir, name[:-3] + ".mpy")
+                args = cmd + ["-o", dest, "-s", os.path.relpath(src, SOURCE)]
+                if march:
+                    args.append("-march=" + march)
+                subprocess.run(args + [src], check=True)
+                compiled += 1
+                src_bytes += os.path.getsize(src)
+                mpy_bytes += os.path.getsize(dest)
+            else:
+                shutil.copy(src, os.path.join(dest_dir, name))
+                copied += 1
+    print("{} modules compiled ({} -> {} bytes), {} files copied to {}".format(
+        compiled, src_bytes, mpy_bytes, copied, os.path.relpath(out, ROOT)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-o", "--out", default=os.path.join(ROOT, "build", "mpy"),
+                    help="output directory (replaced)")
+    ap.add_argument("--march", help="target architecture for native code, e.g. rv32imc")
+    args = ap.parse_args()
+    build(os.path.abspath(args.out), args.march)
+
+
+if __name__ == "__main__":
+    main()
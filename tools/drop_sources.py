@@ -0,0 +1,28 @@
+# Run on the badge after copying a precompiled bundle (tools/build_mpy.py):
+#
+#     mpremote <port> run tools/drop_sources.py
+#
+# Deletes every x.py that has an x.mpy next to it, since MicroPython would
+# import the source instead. Nothing else is touched, so the device ID,
+# settings and other data files stay.
+import os
+
+KEEP = ("/boot.py", "/main.py")  # run by the firmware as sources
+
+
+def drop(folder):
+    removed = 0
+    entries = list(os.ilistdir(folder))
+    names = [e[0] for e in entries]
+    for e in entries:
+        path = folder.rstrip("/") + "/" + e[0]
+        if e[1] == 0x4000:
+            removed += drop(path)
+        elif e[0].endswith(".py") and e[0][:-3] + ".mpy" in names and path not in KEEP:
+            os.remove(path)
+            print("removed", path)
+            removed += 1
+    return removed
+
+
+print("{} sources removed".format(drop("/")))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Stand-in for the badge server, to test the fetch-name flow locally.
+
+Answers GET /getname/<id> like badge.bsides.ee does. Options make it slow,
+failing or oddly framed, to exercise timeouts and response parsing:
+
+    python tools/http_standin.py --port 8080 --name "Ada Lovelace"
+    python tools/http_standin.py --delay 15            # hit the response timeout
+    python tools/http_standin.py --status 500
+    python tools/http_standin.py --chunked --trickle 0.2
+
+Point the badge at it with URL = "http://<this machine's IP>:8080" in
+bsides25.py, or run software/lib/ahttp.py under the MicroPython unix port
+against http://localhost:8080.
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(args):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" if args.chunked else "HTTP/1.0"
+
+        def do_GET(self):
+            time.sleep(args.delay)
+            parts = self.path.strip("/").split("/")
+            if len(parts) == 2 and parts[0] == "getname":
+                data = {"id": parts[1], "name": args.name}
+            else:
+                data = {"error": "not found"}
+            body = json.dumps(data).encode() + b" " * args.pad
+            self.send_response(args.status)
+            self.send_header("Content-Type", "application/json")
+            if args.chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Connection", "close")
+            elif not args.no_length:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            step = args.chunk_size
+            for i in range(0, len(body), step):
+                piece = body[i:i + step]
+                if args.chunked:
+                    piece = b"%x\r\n%s\r\n" % (len(piece), piece)
+                self.wfile.write(piece)
+                self.wfile.flush()
+                time.sleep(args.trickle)
+            if args.chunked:
+                self.wfile.write(b"0\r\n\r\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--name", default="Test Badge")
+    ap.add_argument("--status", type=int, default=200)
+    ap.add_argument("--delay", type=float, default=0, help="seconds before answering")
+    ap.add_argument("--trickle", type=float, default=0, help="seconds between body pieces")
+    ap.add_argument("--chunk-size", type=int, default=16, help="bytes per body piece")
+    ap.add_argument("--chunked", action="store_true", help="chunked transfer encoding")
+    ap.add_argument("--no-length", action="store_true", help="omit Content-Length")
+    ap.add_argument("--pad", type=int, default=0, help="extra bytes of whitespace after the JSON")
+    args = ap.parse_args()
+    server = ThreadingHTTPServer(("", args.port), make_handler(args))
+    print("Serving on port {}".format(args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Render an LED animation on the host into a sequence file for the badge.
+
+Sequence files in software/sequences/ show up in the LED effects menu
+after the built-in effects and are streamed from flash frame by frame
+(software/lib/sequence.py documents the format).
+
+    python tools/make_sequence.py plasma software/sequences/plasma.led
+    python tools/make_sequence.py fire out.led --frames 300 --frame-ms 30 --raw
+
+Add an animation by writing a function frame(t, i, n) -> (r, g, b) with
+t the frame number, i the pixel and n the pixel count, and listing it in
+ANIMATIONS.
+"""
+import argparse
+import colorsys
+import math
+import random
+import struct
+
+MAGIC = b"LEDS"
+VERSION = 1
+FLAG_DELTA = 1
+HEADER = "<4sBBBBHH"
+FULL_FRAME = 255
+
+
+def plasma(t, i, n):
+    a = i / n * 2 * math.pi
+    v = math.sin(a * 2 + t * 0.07) + math.sin(a * 3 - t * 0.05) + math.sin(t * 0.03)
+    h = (v / 6 + 0.5 + t * 0.002) % 1.0
+    return tuple(int(c * 255) for c in colorsys.hsv_to_rgb(h, 1.0, 1.0))
+
+
+_heat = {}
+
+
+def fire(t, i, n):
+    # cheap flicker: each pixel's heat drifts randomly, coloured red..yellow
+    heat = _heat.get(i, 0.5)
+    heat = min(1.0, max(0.1, heat + random.uniform(-0.15, 0.15)))
+    _heat[i] = heat
+    return (255, int(200 * heat * heat), int(40 * heat ** 4))
+
+
+def scanner(t, i, n):
+    # red dot sweeping back and forth with a short tail; few pixels change
+    # per frame, which suits delta encoding
+    span = 2 * (n - 1)
+    pos = t % span
+    head = pos if pos < n else span - pos
+    d = abs(i - head)
+    return (255 >> (2 * d), 0, 0) if d < 3 else (0, 0, 0)
+
+
+ANIMATIONS = {"plasma": plasma, "fire": fire, "scanner": scanner}
+
+
+def render(anim, frames, pixels):
+    return [bytes(c for i in range(pixels) for c in anim(t, i, pixels)) for t in range(frames)]
+
+
+def encode_delta(prev, frame, pixels):
+    if prev is None:
+        return bytes([FULL_FRAME]) + frame
+    changes = [i for i in range(pixels) if frame[i * 3:i * 3 + 3] != prev[i * 3:i * 3 + 3]]
+    if len(changes) * 4 >= pixels * 3 or len(changes) >= FULL_FRAME:
+        return bytes([FULL_FRAME]) + frame
+    out = bytearray([len(changes)])
+    for i in changes:
+        out.append(i)
+        out += frame[i * 3:i * 3 + 3]
+    return bytes(out)
+
+
+def write(path, frames, pixels, frame_ms, delta, quantize):
+    if quantize > 1:
+        # coarser colours leave more pixels unchanged between frames
+        frames = [bytes(c // quantize * quantize for c in f) for f in frames]
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, VERSION, FLAG_DELTA if delta else 0,
+                            pixels, 0, frame_ms, len(frames)))
+        prev = None
+        for frame in frames:
+            # frame 0 is raw so playback can loop back to it
+            f.write(encode_delta(prev, frame, pixels) if delta else frame)
+            prev = frame
+        size = f.tell()
+    print("{}: {} frames of {} pixels, {} bytes".format(path, len(frames), pixels, size))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("animation", choices=sorted(ANIMATIONS))
+    ap.add_argument("output")
+    ap.add_argument("--frames", type=int, default=240)
+    ap.add_argument("--frame-ms", type=int, default=40)
+    ap.add_argument("--pixels", type=int, default=16)
+    ap.add_argument("--raw", action="store_true", help="no delta encoding")
+    ap.add_argument("--quantize", type=int, default=1, help="round colour values to multiples of this")
+    args = ap.parse_args()
+    frames = render(ANIMATIONS[args.animation], args.frames, args.pixels)
+    write(args.output, frames, args.pixels, args.frame_ms, not args.raw, args.quantize)
+
+
+if __name__ == "__main__":
+    main()